@@ -0,0 +1,4 @@
+from backtest.data import MarketData, load_market_data
+from backtest.engine import BacktestResult, run_backtest
+from backtest.sweep import grid, random_search, sweep
+from backtest.matching import ProbabilisticFillModel, QueueFillModel
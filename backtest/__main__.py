@@ -0,0 +1,76 @@
+import argparse
+import importlib
+import json
+import time
+
+from backtest.conversions import ConversionFeed
+from backtest.data import load_market_data
+from backtest.engine import run_backtest
+from backtest.matching import FILL_MODELS
+from backtest.memo import cached_backtest
+from backtest.stream import run_stream
+
+# usage (from the repo root):  python -m backtest final_strategy data/round3.csv
+# several files are streamed and stitched into one multi-day run:
+#                               python -m backtest final_strategy data/round0.csv data/round1.csv
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay an order book file through a Trader")
+    parser.add_argument("module", help="strategy module exposing Trader, e.g. final_strategy")
+    parser.add_argument("data", nargs="+", help="semicolon delimited order book file(s), e.g. data/round3.csv")
+    parser.add_argument("--verbose", action="store_true", help="let the trader print to stdout")
+    parser.add_argument("--fills", choices=sorted(FILL_MODELS), default="none",
+                        help="how resting quotes get filled: none, through (price traded through), "
+                             "queue (through, behind the visible queue) or prob (calibrated probabilities)")
+    parser.add_argument("--latency", metavar="PATH", help="write the per strategy latency report as json")
+    parser.add_argument("--observations", metavar="PATH",
+                        help="conversion feed, e.g. data/round_4_day_1_intermediaries.csv, for MAGNIFICENT_MACARONS")
+    parser.add_argument("--cache", action="store_true",
+                        help="reuse the stored result of an identical earlier run (no latency report or logs)")
+    args = parser.parse_args()
+
+    feed = ConversionFeed.from_csv(args.observations) if args.observations else None
+
+    if len(args.data) > 1:
+        # the probabilistic model calibrates on a fully loaded file, which streaming never builds
+        if args.fills not in ("none", "through", "queue"):
+            parser.error("--fills prob needs a single data file")
+        trader = importlib.import_module(args.module).Trader()
+        start = time.perf_counter()
+        result = run_stream(trader, args.data, fill_model=FILL_MODELS[args.fills](None), quiet=not args.verbose,
+                            conversion_feed=feed)
+        print(result.summary())
+        print(f"\n{len(result.total_pnl)} ticks, {result.n_fills} fills in {time.perf_counter() - start:.3f}s")
+        return
+
+    data = load_market_data(args.data[0])
+
+    # a cache miss runs its own trader, quietly, and a hit has nothing to time, so no latency report either way
+    cached = args.cache and feed is None
+    if cached and args.latency:
+        parser.error("--latency can't be combined with --cache")
+
+    start = time.perf_counter()
+    if cached:
+        result = cached_backtest(args.module, args.data[0], fill=args.fills, data=data)
+    else:
+        trader = importlib.import_module(args.module).Trader()
+        fill_model = FILL_MODELS[args.fills](data)
+        result = run_backtest(trader, data, quiet=not args.verbose, fill_model=fill_model, conversion_feed=feed)
+    elapsed = time.perf_counter() - start
+
+    print(result.summary())
+    print(f"\n{data.n_ticks} ticks, {len(result.fills)} fills in {elapsed:.3f}s")
+
+    if cached:
+        return
+    if result.latency:
+        print("\n" + result.latency_summary())
+    if args.latency:
+        with open(args.latency, "w") as f:
+            json.dump(result.latency, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
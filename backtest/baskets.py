@@ -0,0 +1,23 @@
+import pandas as pd
+
+from backtest.data import MarketData
+from final_strategy import BASKET_RECIPES, RecipeMatrix
+
+# basket premiums and basket-implied component prices for a whole file, through the same RecipeMatrix
+# the strategies use: (ticks, components) @ R.T gives every premium in one matrix-matrix product.
+
+
+def basket_history(data: MarketData, recipes: dict = BASKET_RECIPES) -> pd.DataFrame:
+    rm = RecipeMatrix(recipes)
+    b = data.mid_matrix(rm.baskets)
+    c = data.mid_matrix(rm.components)
+    premium, synthetic = rm.evaluate(b, c)
+
+    frame = {"day": data.tick_day, "timestamp": data.tick_timestamp}
+    for i, basket in enumerate(rm.baskets):
+        frame[f"{basket}.premium"] = premium[:, i]
+    for i, basket in enumerate(rm.baskets):
+        for j, component in enumerate(rm.components):
+            if rm.used[i, j]:
+                frame[f"{component}.from_{basket}"] = synthetic[:, i, j]
+    return pd.DataFrame(frame)
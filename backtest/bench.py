@@ -0,0 +1,191 @@
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from backtest.data import CACHE_DIR, load_market_data
+from backtest.engine import run_backtest
+
+# per tick Trader.run latency / allocation benchmarks, appended to a json history.
+#
+#   python -m backtest.bench                      run every case, save, fail on a p99 regression
+#   python -m backtest.bench --only final_strategy --repeat 5 --tolerance 0.1
+#
+# each case replays a round file through a module's Trader with the normal matching, so states carry
+# realistic positions and traderData. only the trader.run call itself is timed. a timing pass (best of
+# --repeat) is followed by one tracemalloc pass, which is too slow to time under.
+#
+# the check compares each case's p99 with the median p99 of its last --window saved runs and fails when
+# it is more than --tolerance slower and at least --min-delta-us slower in absolute terms. the runs in
+# --baseline (checked in, recorded on e96548a before the perf series) count as the oldest saved runs, so a
+# fresh checkout with no history of its own still catches a regression against them.
+#
+# the history itself lives under data/.cache so benching never dirties the tree.
+
+HISTORY = os.path.join("data", CACHE_DIR, "bench_history.json")
+BASELINE = os.path.join(os.path.dirname(__file__), "bench_baseline.json")
+
+# round4 has no book file of its own (macarons only come with the round 4 data), so it replays round3
+CASES = [
+    ("round0", "data/round0.csv"),
+    ("round1", "data/round1.csv"),
+    ("round2", "data/round2.csv"),
+    ("round3", "data/round3.csv"),
+    ("round4", "data/round3.csv"),
+] + [("final_strategy", f"data/round{i}.csv") for i in range(4)]
+
+PERCENTILES = (50, 90, 99)
+
+
+def case_name(module: str, path: str) -> str:
+    return f"{module}:{os.path.splitext(os.path.basename(path))[0]}"
+
+
+def instrument(trader, samples: list, trace: bool = False) -> None:
+    """wrap trader.run to append ns per call, or with trace the bytes allocated at peak during the call"""
+    run = trader.run
+    clock = time.perf_counter_ns
+
+    if trace:
+        def timed(state):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            out = run(state)
+            samples.append(tracemalloc.get_traced_memory()[1] - base)
+            return out
+    else:
+        def timed(state):
+            start = clock()
+            out = run(state)
+            samples.append(clock() - start)
+            return out
+
+    trader.run = timed
+
+
+def bench_case(module: str, path: str, repeat: int = 3) -> dict:
+    data = load_market_data(path)
+    trader_class = importlib.import_module(module).Trader
+
+    stats = None
+    for _ in range(repeat):
+        samples = []
+        trader = trader_class()
+        instrument(trader, samples)
+        run_backtest(trader, data)
+        us = np.asarray(samples) / 1000
+        run_stats = {f"p{q}_us": float(np.percentile(us, q)) for q in PERCENTILES}
+        run_stats["max_us"] = float(us.max())
+        run_stats["mean_us"] = float(us.mean())
+        # best of the repeats per statistic, the rest is scheduler noise
+        stats = run_stats if stats is None else {k: min(v, run_stats[k]) for k, v in stats.items()}
+
+    samples = []
+    trader = trader_class()
+    instrument(trader, samples, trace=True)
+    tracemalloc.start()
+    try:
+        run_backtest(trader, data)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    kb = np.asarray(samples) / 1024
+
+    stats.update({
+        "ticks": data.n_ticks,
+        "alloc_p50_kb": float(np.percentile(kb, 50)),
+        "alloc_p99_kb": float(np.percentile(kb, 99)),
+        "peak_traced_kb": peak / 1024,
+    })
+    return stats
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    return out.stdout.strip()
+
+
+def load_history(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_history(path: str, history: list) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    staging = f"{path}.tmp"
+    with open(staging, "w") as f:
+        json.dump(history, f, indent=1)
+    os.replace(staging, path)
+
+
+def check(history: list, entry: dict, tolerance: float = 0.25, min_delta_us: float = 20.0, window: int = 5) -> list[str]:
+    """regression messages for entry against the earlier runs in history (empty when fine)"""
+    failures = []
+    for name, stats in entry["cases"].items():
+        previous = [run["cases"][name]["p99_us"] for run in history if name in run.get("cases", {})][-window:]
+        if not previous:
+            continue
+        baseline = float(np.median(previous))
+        p99 = stats["p99_us"]
+        if p99 > baseline * (1 + tolerance) and p99 - baseline >= min_delta_us:
+            failures.append(f"{name}: p99 {p99:.1f}us vs {baseline:.1f}us median of last {len(previous)} runs")
+    return failures
+
+
+def format_table(entry: dict) -> str:
+    lines = [f"{'':<28}{'p50 us':>10}{'p99 us':>10}{'max us':>10}{'alloc p99 kB':>14}{'peak kB':>10}"]
+    for name, s in entry["cases"].items():
+        lines.append(f"{name:<28}{s['p50_us']:>10.1f}{s['p99_us']:>10.1f}{s['max_us']:>10.1f}"
+                     f"{s['alloc_p99_kb']:>14.1f}{s['peak_traced_kb']:>10.0f}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Trader.run per tick across the round files")
+    parser.add_argument("--only", help="only cases whose module:file name contains this")
+    parser.add_argument("--repeat", type=int, default=3, help="timing passes per case, best one is kept")
+    parser.add_argument("--history", default=HISTORY, help="json history file to compare against and append to")
+    parser.add_argument("--baseline", default=BASELINE, help="read-only json runs treated as older than the history")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative p99 slowdown")
+    parser.add_argument("--min-delta-us", type=float, default=20.0, help="ignore p99 slowdowns smaller than this")
+    parser.add_argument("--window", type=int, default=5, help="saved runs the p99 baseline is the median of")
+    parser.add_argument("--no-save", action="store_true", help="don't append this run to the history")
+    parser.add_argument("--no-check", action="store_true", help="report only, never fail")
+    args = parser.parse_args(argv)
+
+    cases = [(m, p) for m, p in CASES if not args.only or args.only in case_name(m, p)]
+    entry = {
+        "time": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "cases": {case_name(m, p): bench_case(m, p, args.repeat) for m, p in cases},
+    }
+    entry["max_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(format_table(entry))
+
+    history = load_history(args.history)
+    failures = [] if args.no_check else check(load_history(args.baseline) + history, entry, args.tolerance, args.min_delta_us, args.window)
+    if not args.no_save:
+        save_history(args.history, history + [entry])
+
+    for failure in failures:
+        print("REGRESSION " + failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
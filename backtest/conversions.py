@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from datamodel import ConversionObservation, Observation
+from backtest.data import MarketData
+
+# conversion side of round 4: MAGNIFICENT_MACARONS can also be bought from / sold to a foreign island
+# at the prices in the intermediaries feed (comma delimited, one row per timestamp). exchange rules:
+#   - conversions only reduce an open position: positive covers a short, negative sells off a long
+#   - importing (covering a short) pays askPrice + transportFees + importTariff per unit
+#   - exporting (selling a long) receives bidPrice - transportFees - exportTariff per unit
+#   - at most CONVERSION_LIMIT units per tick, and long positions pay STORAGE_COST per unit per tick
+
+CONVERSION_PRODUCT = "MAGNIFICENT_MACARONS"
+CONVERSION_LIMIT = 10
+STORAGE_COST = 0.1
+
+FEED_COLUMNS = ["bidPrice", "askPrice", "transportFees", "exportTariff", "importTariff", "sugarPrice", "sunlightIndex"]
+
+
+class ConversionFeed:
+    def __init__(self, timestamps, columns: dict, symbol: str = CONVERSION_PRODUCT,
+                 limit: int = CONVERSION_LIMIT, storage_cost: float = STORAGE_COST) -> None:
+        self.symbol = symbol
+        self.limit = limit
+        self.storage_cost = storage_cost
+        self.timestamps = np.asarray(timestamps, dtype=np.int64)
+        self.columns = {name: np.asarray(columns[name], dtype=np.float64) for name in FEED_COLUMNS}
+
+        # per unit cost / proceeds of a conversion at every feed row
+        c = self.columns
+        self.import_cost = c["askPrice"] + c["transportFees"] + c["importTariff"]
+        self.export_proceeds = c["bidPrice"] - c["transportFees"] - c["exportTariff"]
+
+        self._rows = np.column_stack([self.columns[name] for name in FEED_COLUMNS]).tolist()
+        self._row = 0
+
+    @classmethod
+    def from_csv(cls, path: str, **kwargs) -> "ConversionFeed":
+        df = pd.read_csv(path).sort_values("timestamp", kind="stable")
+        return cls(df["timestamp"].to_numpy(), {name: df[name].to_numpy() for name in FEED_COLUMNS}, **kwargs)
+
+    def row_at(self, timestamps) -> np.ndarray:
+        """index of the latest feed row at or before each timestamp (-1 before the first row)"""
+        return np.searchsorted(self.timestamps, np.asarray(timestamps), side="right") - 1
+
+    def observation(self, timestamp: int) -> Observation:
+        # ticks arrive in order, so walk forward instead of searching; rewind when a new day starts over
+        if self._row >= len(self.timestamps) or self.timestamps[self._row] > timestamp:
+            self._row = 0
+        while self._row + 1 < len(self.timestamps) and self.timestamps[self._row + 1] <= timestamp:
+            self._row += 1
+        if not len(self.timestamps) or self.timestamps[self._row] > timestamp:
+            return Observation({}, {})
+        return Observation({}, {self.symbol: ConversionObservation(*self._rows[self._row])})
+
+    def convert(self, request: int, position: int, timestamp: int):
+        """(units converted, cash change) for a conversion request against the current position"""
+        if request == 0 or position == 0 or (request > 0) == (position > 0):
+            return 0, 0.0
+        row = self.row_at(timestamp)
+        if row < 0:
+            return 0, 0.0
+        units = min(abs(request), abs(position), self.limit)
+        if request > 0:
+            return units, -units * float(self.import_cost[row])
+        return -units, units * float(self.export_proceeds[row])
+
+    def edges(self, data: MarketData) -> pd.DataFrame:
+        """implied arbitrage per tick of data, all in one pass:
+        import_edge  = local best bid - import cost        (sell here, import to cover)
+        export_edge  = export proceeds - local best ask    (buy here, export to close)"""
+        rows = self.row_at(data.tick_timestamp)
+        valid = rows >= 0
+        rows = np.where(valid, rows, 0)
+
+        import_cost = np.where(valid, self.import_cost[rows], np.nan)
+        export_proceeds = np.where(valid, self.export_proceeds[rows], np.nan)
+        local_bid = data.matrix(data.bid_price[:, 0], [self.symbol])[:, 0]
+        local_ask = data.matrix(data.ask_price[:, 0], [self.symbol])[:, 0]
+
+        return pd.DataFrame({
+            "day": data.tick_day,
+            "timestamp": data.tick_timestamp,
+            "local_bid": local_bid,
+            "local_ask": local_ask,
+            "import_cost": import_cost,
+            "export_proceeds": export_proceeds,
+            "import_edge": local_bid - import_cost,
+            "export_edge": export_proceeds - local_ask,
+        })
@@ -0,0 +1,166 @@
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# order book snapshot files exported from the prosperity dashboard (data/round*.csv)
+LEVELS = 3
+
+# parsed files are kept as one .npy per column in <data dir>/.cache/<file stem>/
+CACHE_DIR = ".cache"
+CACHE_VERSION = 1
+ARRAY_COLUMNS = ["day", "timestamp", "product", "bid_price", "bid_volume", "ask_price", "ask_volume", "mid_price", "tick_starts"]
+
+
+class MarketData:
+    """Column arrays for one order book file, sorted by (day, timestamp, product)."""
+
+    def __init__(self, day, timestamp, product, products, bid_price, bid_volume, ask_price, ask_volume, mid_price, tick_starts=None):
+        self.day = day
+        self.timestamp = timestamp
+        self.product = product          # int codes into self.products
+        self.products = products
+        self.bid_price = bid_price      # (rows, LEVELS) float, nan where the level is empty
+        self.bid_volume = bid_volume
+        self.ask_price = ask_price
+        self.ask_volume = ask_volume
+        self.mid_price = mid_price
+
+        # row index where each (day, timestamp) tick starts, plus the end sentinel
+        if tick_starts is None:
+            new_tick = np.ones(len(day), dtype=bool)
+            new_tick[1:] = (day[1:] != day[:-1]) | (timestamp[1:] != timestamp[:-1])
+            tick_starts = np.append(np.flatnonzero(new_tick), len(day))
+        self.tick_starts = tick_starts
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    @property
+    def n_ticks(self) -> int:
+        return len(self.tick_starts) - 1
+
+    @property
+    def tick_day(self):
+        return self.day[self.tick_starts[:-1]]
+
+    @property
+    def tick_timestamp(self):
+        return self.timestamp[self.tick_starts[:-1]]
+
+    def tick_index(self):
+        """tick number for every row"""
+        return np.repeat(np.arange(self.n_ticks), np.diff(self.tick_starts))
+
+    def slice_ticks(self, start: int, end: int) -> "MarketData":
+        """ticks [start, end) as views into the same arrays, nothing is copied or re-parsed"""
+        lo, hi = int(self.tick_starts[start]), int(self.tick_starts[end])
+        return MarketData(self.day[lo:hi], self.timestamp[lo:hi], self.product[lo:hi], self.products,
+                          self.bid_price[lo:hi], self.bid_volume[lo:hi], self.ask_price[lo:hi],
+                          self.ask_volume[lo:hi], self.mid_price[lo:hi], self.tick_starts[start:end + 1] - lo)
+
+    def matrix(self, values: np.ndarray, symbols) -> np.ndarray:
+        """scatter a per-row column into (ticks, symbols), nan where a symbol has no row"""
+        out = np.full((self.n_ticks, len(symbols)), np.nan)
+        codes = {p: i for i, p in enumerate(self.products)}
+        ticks = self.tick_index()
+        for j, symbol in enumerate(symbols):
+            if symbol in codes:
+                rows = self.product == codes[symbol]
+                out[ticks[rows], j] = values[rows]
+        return out
+
+    def mid_matrix(self, symbols) -> np.ndarray:
+        """(ticks, symbols) top-of-book mids, nan where a symbol has no two-sided book"""
+        return self.matrix((self.bid_price[:, 0] + self.ask_price[:, 0]) / 2, symbols)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Rebuild the dashboard layout, so notebooks can read through the cache too."""
+        frame = {"day": self.day, "timestamp": self.timestamp,
+                 "product": np.asarray(self.products, dtype=object)[self.product]}
+        for side in ("bid", "ask"):
+            prices, volumes = getattr(self, f"{side}_price"), getattr(self, f"{side}_volume")
+            for i in range(LEVELS):
+                frame[f"{side}_price_{i + 1}"] = prices[:, i]
+                frame[f"{side}_volume_{i + 1}"] = volumes[:, i]
+        frame["mid_price"] = self.mid_price
+        return pd.DataFrame(frame)
+
+
+def from_frame(df: pd.DataFrame) -> MarketData:
+    df = df.sort_values(["day", "timestamp", "product"], kind="stable")
+    codes, products = pd.factorize(df["product"], sort=True)
+
+    def levels(side, field):
+        cols = [f"{side}_{field}_{i}" for i in range(1, LEVELS + 1)]
+        return df[cols].to_numpy(dtype=np.float64)
+
+    return MarketData(
+        day=df["day"].to_numpy(dtype=np.int64),
+        timestamp=df["timestamp"].to_numpy(dtype=np.int64),
+        product=codes.astype(np.int32),
+        products=list(products),
+        bid_price=levels("bid", "price"),
+        bid_volume=levels("bid", "volume"),
+        ask_price=levels("ask", "price"),
+        ask_volume=levels("ask", "volume"),
+        mid_price=df["mid_price"].to_numpy(dtype=np.float64),
+    )
+
+
+def parse_market_data(path: str) -> MarketData:
+    return from_frame(pd.read_csv(path, sep=";"))
+
+
+def cache_path(path: str) -> str:
+    directory, name = os.path.split(os.path.abspath(path))
+    return os.path.join(directory, CACHE_DIR, os.path.splitext(name)[0])
+
+
+def source_fingerprint(path: str) -> dict:
+    stat = os.stat(path)
+    return {"version": CACHE_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def write_cache(data: MarketData, path: str) -> None:
+    target = cache_path(path)
+    staging = target + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    for column in ARRAY_COLUMNS:
+        np.save(os.path.join(staging, column + ".npy"), np.ascontiguousarray(getattr(data, column)))
+    with open(os.path.join(staging, "meta.json"), "w") as f:
+        json.dump({"source": source_fingerprint(path), "products": data.products}, f)
+
+    # swap the finished directory in so a crashed write never looks valid
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+
+
+def read_cache(path: str):
+    target = cache_path(path)
+    try:
+        with open(os.path.join(target, "meta.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("source") != source_fingerprint(path):
+        return None
+
+    columns = {c: np.load(os.path.join(target, c + ".npy"), mmap_mode="r") for c in ARRAY_COLUMNS}
+    return MarketData(products=meta["products"], **columns)
+
+
+def load_market_data(path: str, use_cache: bool = True) -> MarketData:
+    """Load an order book file, going through the memory-mapped column cache when possible."""
+    if not use_cache:
+        return parse_market_data(path)
+
+    data = read_cache(path)
+    if data is None:
+        write_cache(parse_market_data(path), path)
+        data = read_cache(path)
+    return data
@@ -0,0 +1,229 @@
+import contextlib
+import io
+import os
+
+import numpy as np
+
+from datamodel import Observation
+from backtest.data import MarketData
+from backtest.fastmodel import Listing, OrderDepth, TradingState
+from backtest.matching import SUBMISSION, match_orders, passive_fills
+
+# exchange position limits, used when the trader does not expose its own `limits`
+DEFAULT_LIMITS = {
+    "RAINFOREST_RESIN": 50,
+    "KELP": 50,
+    "SQUID_INK": 50,
+    "CROISSANTS": 250,
+    "JAMS": 350,
+    "DJEMBES": 60,
+    "PICNIC_BASKET1": 60,
+    "PICNIC_BASKET2": 100,
+    "VOLCANIC_ROCK": 400,
+    "VOLCANIC_ROCK_VOUCHER_9500": 200,
+    "VOLCANIC_ROCK_VOUCHER_9750": 200,
+    "VOLCANIC_ROCK_VOUCHER_10000": 200,
+    "VOLCANIC_ROCK_VOUCHER_10250": 200,
+    "VOLCANIC_ROCK_VOUCHER_10500": 200,
+    "MAGNIFICENT_MACARONS": 75,
+}
+
+
+class BacktestResult:
+    def __init__(self, products, days, timestamps, pnl, position, fills, latency=None, logs=""):
+        self.products = products
+        self.days = days
+        self.timestamps = timestamps
+        self.pnl = pnl                  # (ticks, products) marked-to-mid pnl
+        self.position = position        # (ticks, products) position after matching
+        self.fills = fills              # list of (tick index, Trade)
+        self.latency = latency or {}    # per strategy timing report from the trader, if it keeps one
+        self.logs = logs                # trader stdout when run with capture_logs=True
+
+    @property
+    def total_pnl(self) -> float:
+        return float(self.pnl[-1].sum()) if len(self.pnl) else 0.0
+
+    def final_pnl(self) -> dict:
+        if not len(self.pnl):
+            return {p: 0.0 for p in self.products}
+        return {p: float(v) for p, v in zip(self.products, self.pnl[-1])}
+
+    def summary(self) -> str:
+        lines = [f"{p:<30}{v:>12.1f}" for p, v in self.final_pnl().items()]
+        lines.append(f"{'TOTAL':<30}{self.total_pnl:>12.1f}")
+        return "\n".join(lines)
+
+    def latency_summary(self) -> str:
+        lines = [f"{'':<30}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'skipped':>10}"]
+        for name, stats in sorted(self.latency.items()):
+            lines.append(f"{name:<30}{stats['p50_ms']:>10.3f}{stats['p99_ms']:>10.3f}{stats['max_ms']:>10.3f}{stats['skipped']:>10}")
+        return "\n".join(lines)
+
+
+def build_order_depth(bid_prices, bid_volumes, ask_prices, ask_volumes) -> OrderDepth:
+    od = OrderDepth()
+    for price, volume in zip(bid_prices, bid_volumes):
+        if price == price:  # skip nan levels
+            od.buy_orders[int(price)] = int(volume)
+    for price, volume in zip(ask_prices, ask_volumes):
+        if price == price:
+            od.sell_orders[int(price)] = -int(volume)
+    return od
+
+
+class Replay:
+    """exchange side of a backtest: feeds one snapshot at a time to the trader, matches what comes back
+    and keeps cash / positions. works off any source of ticks, see run_backtest and backtest.stream"""
+
+    def __init__(self, trader, limits: dict = None, fill_model=None, conversion_feed=None) -> None:
+        self.trader = trader
+        self.limits = limits or getattr(trader, "limits", None) or DEFAULT_LIMITS
+        self.fill_model = fill_model
+        self.conversion_feed = conversion_feed     # backtest.conversions.ConversionFeed
+        self.listings = {}
+        self.observations = Observation({}, {})
+        self.cash = {}
+        self.last_mid = {}
+        self.position = {}
+        self.own_trades = {}
+        self.trader_data = ""
+        self.resting = {}
+        self.tick = -1
+        self.n_fills = 0
+        self.n_conversions = 0
+        self.on_fill = None     # callback(tick, trade), e.g. to keep a fill log
+
+    def book_trades(self, symbol, trades, tick) -> None:
+        pos = self.position.get(symbol, 0)
+        cash = self.cash.get(symbol, 0.0)
+        for trade in trades:
+            if trade.buyer == SUBMISSION:
+                pos += trade.quantity
+                cash -= trade.price * trade.quantity
+            else:
+                pos -= trade.quantity
+                cash += trade.price * trade.quantity
+            if self.on_fill is not None:
+                self.on_fill(tick, trade)
+        self.position[symbol] = pos
+        self.cash[symbol] = cash
+        self.n_fills += len(trades)
+        self.own_trades.setdefault(symbol, []).extend(trades)
+
+    def step(self, timestamp: int, depths: dict, mids: dict, observations=None) -> None:
+        self.tick += 1
+        t = self.tick
+        for symbol, mid in mids.items():
+            if mid == mid and mid > 0:
+                self.last_mid[symbol] = mid
+            if symbol not in self.listings:
+                self.listings[symbol] = Listing(symbol, symbol, "SEASHELLS")
+
+        # quotes from the last tick that the market traded into before this snapshot
+        for symbol, (quotes, placed, placed_at) in self.resting.items():
+            if symbol in depths:
+                trades = passive_fills(self.fill_model, symbol, quotes, placed, depths[symbol], placed_at)
+                if trades:
+                    self.book_trades(symbol, trades, t - 1)
+        self.resting = {}
+
+        feed = self.conversion_feed
+        if observations is None and feed is not None:
+            observations = feed.observation(timestamp)
+        state = TradingState(self.trader_data, timestamp, self.listings, depths, self.own_trades, {},
+                             dict(self.position), observations or self.observations)
+        orders, conversions, self.trader_data = self.trader.run(state)
+
+        if feed is not None:
+            self.convert(feed, conversions or 0, timestamp)
+
+        self.own_trades = {}
+        for symbol, symbol_orders in orders.items():
+            if symbol not in depths or not symbol_orders:
+                continue
+            pos = self.position.get(symbol, 0)
+            trades, quotes = match_orders(symbol, symbol_orders, depths[symbol], pos, self.limits.get(symbol, 0), timestamp)
+            if trades:
+                self.book_trades(symbol, trades, t)
+            if quotes and self.fill_model is not None:
+                self.resting[symbol] = (quotes, depths[symbol], timestamp)
+
+    def convert(self, feed, request: int, timestamp: int) -> None:
+        symbol = feed.symbol
+        pos = self.position.get(symbol, 0)
+        units, cash = feed.convert(request, pos, timestamp)
+        if units:
+            pos += units
+            self.position[symbol] = pos
+            self.n_conversions += abs(units)
+        if units or pos > 0:
+            # storage is charged on whatever long is left over for the tick
+            self.cash[symbol] = self.cash.get(symbol, 0.0) + cash - max(pos, 0) * feed.storage_cost
+
+    def pnl(self, symbol: str) -> float:
+        return self.cash.get(symbol, 0.0) + self.position.get(symbol, 0) * self.last_mid.get(symbol, 0.0)
+
+
+def apply_params(trader, params: dict) -> None:
+    for key, value in params.items():
+        cls, name = key.split(".", 1)
+        for strategy in trader.strategies.values():
+            if type(strategy).__name__ != cls:
+                continue
+            # windows are deques sized at construction, so resize them in place
+            current = getattr(strategy, name, None)
+            if hasattr(current, "maxlen") and isinstance(value, int):
+                value = type(current)(current, maxlen=value)
+            setattr(strategy, name, value)
+
+
+def iter_ticks(data: MarketData):
+    """(day, timestamp, depths, mids) for every tick of an in-memory file"""
+    products = data.products
+    # python lists are much faster to index row by row than numpy arrays
+    starts = data.tick_starts.tolist()
+    days = data.tick_day.tolist()
+    timestamps = data.tick_timestamp.tolist()
+    product = data.product.tolist()
+    bid_price, bid_volume = data.bid_price.tolist(), data.bid_volume.tolist()
+    ask_price, ask_volume = data.ask_price.tolist(), data.ask_volume.tolist()
+    mid_price = data.mid_price.tolist()
+
+    for t in range(data.n_ticks):
+        depths = {}
+        mids = {}
+        for row in range(starts[t], starts[t + 1]):
+            symbol = products[product[row]]
+            depths[symbol] = build_order_depth(bid_price[row], bid_volume[row], ask_price[row], ask_volume[row])
+            mids[symbol] = mid_price[row]
+        yield days[t], timestamps[t], depths, mids
+
+
+def run_backtest(trader, data: MarketData, limits: dict = None, quiet: bool = True, capture_logs: bool = False,
+                 fill_model=None, conversion_feed=None) -> BacktestResult:
+    """replay data through trader.run. fill_model (see backtest.matching) fills quotes left resting
+    in the book against the next snapshot; without one only orders that cross the book fill.
+    conversion_feed (see backtest.conversions) supplies observations and settles conversion requests"""
+    products = data.products
+    n_ticks = data.n_ticks
+
+    pnl = np.zeros((n_ticks, len(products)))
+    position_history = np.zeros((n_ticks, len(products)), dtype=np.int64)
+    fills = []
+
+    replay = Replay(trader, limits, fill_model, conversion_feed)
+    replay.on_fill = lambda tick, trade: fills.append((tick, trade))
+
+    sink = io.StringIO() if capture_logs else open(os.devnull, "w")
+    with sink, (contextlib.redirect_stdout(sink) if quiet or capture_logs else contextlib.nullcontext()):
+        for t, (_, timestamp, depths, mids) in enumerate(iter_ticks(data)):
+            replay.step(timestamp, depths, mids)
+            for i, symbol in enumerate(products):
+                pnl[t, i] = replay.pnl(symbol)
+                position_history[t, i] = replay.position.get(symbol, 0)
+
+        logs = sink.getvalue() if capture_logs else ""
+
+    latency = trader.latency.report() if hasattr(trader, "latency") else None
+    return BacktestResult(products, data.tick_day, data.tick_timestamp, pnl, position_history, fills, latency, logs)
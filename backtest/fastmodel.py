@@ -0,0 +1,110 @@
+import json
+
+from datamodel import ProsperityEncoder
+
+# __slots__ versions of the datamodel classes for replay. same attribute names and str/repr as datamodel,
+# so strategies can't tell the difference, but no per-instance __dict__ to allocate or look through.
+
+
+class Listing:
+    __slots__ = ("symbol", "product", "denomination")
+
+    def __init__(self, symbol, product, denomination):
+        self.symbol = symbol
+        self.product = product
+        self.denomination = denomination
+
+
+class Order:
+    __slots__ = ("symbol", "price", "quantity")
+
+    def __init__(self, symbol, price: int, quantity: int) -> None:
+        self.symbol = symbol
+        self.price = price
+        self.quantity = quantity
+
+    def __str__(self) -> str:
+        return "(" + self.symbol + ", " + str(self.price) + ", " + str(self.quantity) + ")"
+
+    __repr__ = __str__
+
+
+class OrderDepth:
+    __slots__ = ("buy_orders", "sell_orders")
+
+    def __init__(self, buy_orders: dict = None, sell_orders: dict = None):
+        self.buy_orders = {} if buy_orders is None else buy_orders
+        self.sell_orders = {} if sell_orders is None else sell_orders
+
+
+class Trade:
+    __slots__ = ("symbol", "price", "quantity", "buyer", "seller", "timestamp")
+
+    def __init__(self, symbol, price: int, quantity: int, buyer=None, seller=None, timestamp: int = 0) -> None:
+        self.symbol = symbol
+        self.price = price
+        self.quantity = quantity
+        self.buyer = buyer
+        self.seller = seller
+        self.timestamp = timestamp
+
+    def __str__(self) -> str:
+        return "(" + self.symbol + ", " + self.buyer + " << " + self.seller + ", " + str(self.price) + ", " + str(self.quantity) + ", " + str(self.timestamp) + ")"
+
+    __repr__ = __str__
+
+
+class TradingState:
+    __slots__ = ("traderData", "timestamp", "listings", "order_depths", "own_trades", "market_trades", "position", "observations")
+
+    def __init__(self, traderData, timestamp, listings, order_depths, own_trades, market_trades, position, observations):
+        self.traderData = traderData
+        self.timestamp = timestamp
+        self.listings = listings
+        self.order_depths = order_depths
+        self.own_trades = own_trades
+        self.market_trades = market_trades
+        self.position = position
+        self.observations = observations
+
+    def toJSON(self):
+        return json.dumps(self, cls=FastEncoder, sort_keys=True)
+
+
+def as_dict(o) -> dict:
+    slots = getattr(type(o), "__slots__", None)
+    if slots is not None:
+        return {name: getattr(o, name) for name in slots}
+    return o.__dict__
+
+
+class FastEncoder(ProsperityEncoder):
+    """ProsperityEncoder that also understands slotted objects; output is identical for both kinds"""
+
+    def default(self, o):
+        return as_dict(o)
+
+
+def _trades(trades: dict) -> dict:
+    return {s: [as_dict(t) for t in ts] for s, ts in trades.items()}
+
+
+def state_to_dict(state) -> dict:
+    """plain dict tree for a TradingState (slotted or datamodel), built without encoder callbacks"""
+    return {
+        "traderData": state.traderData,
+        "timestamp": state.timestamp,
+        "listings": {s: as_dict(l) for s, l in state.listings.items()},
+        "order_depths": {s: {"buy_orders": d.buy_orders, "sell_orders": d.sell_orders} for s, d in state.order_depths.items()},
+        "own_trades": _trades(state.own_trades),
+        "market_trades": _trades(state.market_trades),
+        "position": state.position,
+        "observations": {
+            "plainValueObservations": state.observations.plainValueObservations,
+            "conversionObservations": {p: as_dict(c) for p, c in state.observations.conversionObservations.items()},
+        },
+    }
+
+
+def state_to_json(state) -> str:
+    return json.dumps(state_to_dict(state), sort_keys=True)
@@ -0,0 +1,30 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+# parses the one-line-per-tick json records written by final_strategy.Logger.flush
+
+
+def read_records(text: str) -> list[dict]:
+    return [json.loads(line) for line in text.splitlines() if line.startswith('{"t":')]
+
+
+def parse_logs(text: str) -> dict:
+    """orders, positions and signals from captured trader stdout as dataframes"""
+    records = read_records(text)
+
+    counts = [len(r["o"][0]) for r in records]
+    orders = pd.DataFrame({
+        "timestamp": np.repeat([r["t"] for r in records], counts),
+        "symbol": [s for r in records for s in r["o"][0]],
+        "price": np.fromiter((p for r in records for p in r["o"][1]), dtype=np.int64, count=sum(counts)),
+        "quantity": np.fromiter((q for r in records for q in r["o"][2]), dtype=np.int64, count=sum(counts)),
+    })
+
+    index = [r["t"] for r in records]
+    positions = pd.DataFrame([r["p"] for r in records], index=index).fillna(0).astype(np.int64)
+    signals = pd.DataFrame([r["s"] for r in records], index=index)
+    messages = [(r["t"], m) for r in records for m in r["m"]]
+
+    return {"orders": orders, "positions": positions, "signals": signals, "messages": messages}
@@ -0,0 +1,170 @@
+import random
+
+import numpy as np
+
+from backtest.data import LEVELS, MarketData
+from backtest.fastmodel import Trade
+
+SUBMISSION = "SUBMISSION"
+
+# orders only live for one tick on the exchange. whatever doesn't cross the book on submission rests
+# until the next snapshot, and a fill model decides how much of it bots would have hit in between.
+
+
+def match_orders(symbol, orders, depth, position: int, limit: int, timestamp: int):
+    """cross orders against the snapshot book; returns (trades, resting) with resting as [(price, signed qty)]"""
+    # the exchange cancels every order for a product if they could breach the limit together
+    buys = sum(o.quantity for o in orders if o.quantity > 0)
+    sells = -sum(o.quantity for o in orders if o.quantity < 0)
+    if position + buys > limit or position - sells < -limit:
+        return [], []
+
+    asks = dict(depth.sell_orders)
+    bids = dict(depth.buy_orders)
+    trades = []
+    resting = []
+
+    for order in orders:
+        if order.quantity > 0:
+            remaining = order.quantity
+            for price in sorted(asks):
+                if price > order.price or remaining == 0:
+                    break
+                fill = min(-asks[price], remaining)
+                trades.append(Trade(symbol, price, fill, SUBMISSION, "", timestamp))
+                asks[price] += fill
+                if asks[price] == 0:
+                    del asks[price]
+                remaining -= fill
+            if remaining:
+                resting.append((order.price, remaining))
+        elif order.quantity < 0:
+            remaining = -order.quantity
+            for price in sorted(bids, reverse=True):
+                if price < order.price or remaining == 0:
+                    break
+                fill = min(bids[price], remaining)
+                trades.append(Trade(symbol, price, fill, "", SUBMISSION, timestamp))
+                bids[price] -= fill
+                if bids[price] == 0:
+                    del bids[price]
+                remaining -= fill
+            if remaining:
+                resting.append((order.price, -remaining))
+
+    return trades, resting
+
+
+class QueueFillModel:
+    """fills a resting quote when the next snapshot trades through its price.
+
+    volume on the far side at or through our price is what crossed. when queue_aware is set and we
+    joined an existing level, the volume that was already queued there has to trade first."""
+
+    def __init__(self, queue_aware: bool = True) -> None:
+        self.queue_aware = queue_aware
+
+    def fill(self, symbol, price: int, quantity: int, placed, current) -> int:
+        if quantity > 0:
+            crossed = sum(-v for p, v in current.sell_orders.items() if p <= price)
+            ahead = placed.buy_orders.get(price, 0) if self.queue_aware else 0
+        else:
+            crossed = sum(v for p, v in current.buy_orders.items() if p >= price)
+            ahead = placed.sell_orders.get(price, 0) * -1 if self.queue_aware else 0
+        return min(abs(quantity), max(crossed - ahead, 0))
+
+
+class ProbabilisticFillModel:
+    """fills a resting quote with a probability looked up by how far it improves the touch, for a size
+    drawn from what crossed on the hits.
+
+    calibrate() measures, for each product and improvement k, how often the next snapshot's opposite
+    side reached best_bid + k (bids) / best_ask - k (asks), and the volume at or through that price when
+    it did, kept as SIZE_QUANTILES evenly spaced quantiles."""
+
+    SIZE_QUANTILES = 20
+
+    def __init__(self, probabilities: dict = None, max_offset: int = 5, scale: float = 1.0, seed: int = 0,
+                 sizes: dict = None) -> None:
+        self.probabilities = probabilities or {}
+        self.sizes = sizes or {}
+        self.max_offset = max_offset
+        self.scale = scale
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def calibrate(cls, data: MarketData, max_offset: int = 5, **kwargs) -> "ProbabilisticFillModel":
+        # (ticks, products, levels) books, volumes 0 where a level is empty
+        def levels(prices, volumes):
+            p = np.stack([data.matrix(prices[:, i], data.products) for i in range(LEVELS)], axis=-1)
+            v = np.stack([data.matrix(volumes[:, i], data.products) for i in range(LEVELS)], axis=-1)
+            return p, np.nan_to_num(np.abs(v))
+
+        bid_p, bid_v = levels(data.bid_price, data.bid_volume)
+        ask_p, ask_v = levels(data.ask_price, data.ask_volume)
+        offsets = np.arange(-max_offset, max_offset + 1)
+        q = (np.arange(cls.SIZE_QUANTILES) + 0.5) / cls.SIZE_QUANTILES
+
+        def side(quote, ok, next_p, next_v, through):
+            # quote is (ticks, offsets); crossed is (offsets, ticks), the next snapshot's volume at or
+            # through each quote price
+            crossed = (through(next_p[ok][None], quote[ok].T[:, :, None]) * next_v[ok][None]).sum(axis=-1)
+            hit = crossed > 0
+            sizes = [np.quantile(c[h], q).round().astype(int).tolist() if h.any() else [] for c, h in zip(crossed, hit)]
+            return hit.mean(axis=1).tolist(), sizes
+
+        probabilities = {}
+        sizes = {}
+        for j, symbol in enumerate(data.products):
+            bid, ask = bid_p[:-1, j, 0], ask_p[:-1, j, 0]
+            ok_bid = np.isfinite(bid) & np.isfinite(ask_p[1:, j, 0])
+            ok_ask = np.isfinite(ask) & np.isfinite(bid_p[1:, j, 0])
+            if not ok_bid.any() or not ok_ask.any():
+                continue
+            bid_probs, bid_sizes = side(bid[:, None] + offsets, ok_bid, ask_p[1:, j], ask_v[1:, j], np.less_equal)
+            ask_probs, ask_sizes = side(ask[:, None] - offsets, ok_ask, bid_p[1:, j], bid_v[1:, j], np.greater_equal)
+            probabilities[symbol] = (bid_probs, ask_probs)
+            sizes[symbol] = (bid_sizes, ask_sizes)
+
+        return cls(probabilities, max_offset, sizes=sizes, **kwargs)
+
+    def fill(self, symbol, price: int, quantity: int, placed, current) -> int:
+        table = self.probabilities.get(symbol)
+        if table is None:
+            return 0
+        side = 0 if quantity > 0 else 1
+        if quantity > 0:
+            best = max(placed.buy_orders, default=None)
+            offset = price - best if best is not None else self.max_offset
+        else:
+            best = min(placed.sell_orders, default=None)
+            offset = best - price if best is not None else self.max_offset
+        i = min(max(offset, -self.max_offset), self.max_offset) + self.max_offset
+        if self.rng.random() >= self.scale * table[side][i]:
+            return 0
+        # without calibrated sizes (hand built probabilities) a hit fills in full
+        sizes = self.sizes.get(symbol)
+        if sizes is None:
+            return abs(quantity)
+        drawn = sizes[side][i]
+        return min(abs(quantity), self.rng.choice(drawn)) if drawn else 0
+
+
+def passive_fills(model, symbol, resting, placed, current, timestamp: int) -> list[Trade]:
+    trades = []
+    for price, quantity in resting:
+        filled = model.fill(symbol, price, quantity, placed, current)
+        if filled > 0:
+            if quantity > 0:
+                trades.append(Trade(symbol, price, filled, SUBMISSION, "", timestamp))
+            else:
+                trades.append(Trade(symbol, price, filled, "", SUBMISSION, timestamp))
+    return trades
+
+
+FILL_MODELS = {
+    "none": lambda data: None,
+    "through": lambda data: QueueFillModel(queue_aware=False),
+    "queue": lambda data: QueueFillModel(queue_aware=True),
+    "prob": ProbabilisticFillModel.calibrate,
+}
@@ -0,0 +1,143 @@
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+
+import numpy as np
+
+import datamodel
+from backtest.data import CACHE_DIR, load_market_data
+from backtest.engine import BacktestResult, apply_params, run_backtest
+from backtest.fastmodel import Trade
+from backtest.matching import FILL_MODELS, SUBMISSION
+
+# content addressed store of finished backtests in <data dir>/.cache/backtests/<key>.npz.
+# the key covers the trader module source, the parameter overrides, the data file contents, the fill
+# model and the replay code itself (every source file of this package plus datamodel), so any edit to
+# one of them is a miss rather than a stale hit.
+
+MAX_BYTES = 512 * 1024 * 1024
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def replay_sources() -> list[str]:
+    package = os.path.dirname(os.path.abspath(__file__))
+    names = sorted(name for name in os.listdir(package) if name.endswith(".py"))
+    return [os.path.join(package, name) for name in names] + [datamodel.__file__]
+
+
+def backtest_key(module: str, data_path: str, params: dict = None, fill: str = "none") -> str:
+    h = hashlib.sha256()
+    for source in [importlib.util.find_spec(module).origin] + replay_sources():
+        h.update(file_digest(source).encode())
+    h.update(json.dumps(params or {}, sort_keys=True, default=str).encode())
+    h.update(file_digest(data_path).encode())
+    h.update(fill.encode())
+    return h.hexdigest()[:32]
+
+
+class ResultCache:
+    def __init__(self, directory: str, max_bytes: int = MAX_BYTES) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".npz")
+
+    def get(self, key: str):
+        path = self.path(key)
+        try:
+            with np.load(path, allow_pickle=False) as f:
+                result = decode_result(f)
+        except (OSError, ValueError, KeyError):
+            return None
+        # mtime doubles as the last-used time for eviction
+        os.utime(path)
+        return result
+
+    def put(self, key: str, result: BacktestResult) -> None:
+        path = self.path(key)
+        staging = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(staging, **encode_result(result))
+        os.replace(staging, path)
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz") and ".tmp" not in name:
+                try:
+                    st = os.stat(os.path.join(self.directory, name))
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= size
+
+
+def encode_result(result: BacktestResult) -> dict:
+    code = {p: i for i, p in enumerate(result.products)}
+    fills = result.fills
+    return {
+        "products": np.array(result.products),
+        "days": np.asarray(result.days),
+        "timestamps": np.asarray(result.timestamps),
+        "pnl": result.pnl,
+        "position": result.position,
+        "fill_tick": np.array([t for t, _ in fills], dtype=np.int64),
+        "fill_symbol": np.array([code[tr.symbol] for _, tr in fills], dtype=np.int32),
+        "fill_price": np.array([tr.price for _, tr in fills], dtype=np.int64),
+        # signed from our side: + bought, - sold
+        "fill_quantity": np.array([tr.quantity if tr.buyer == SUBMISSION else -tr.quantity for _, tr in fills], dtype=np.int64),
+    }
+
+
+def decode_result(f) -> BacktestResult:
+    products = f["products"].tolist()
+    timestamps = f["timestamps"]
+    fills = []
+    for t, s, price, qty in zip(f["fill_tick"].tolist(), f["fill_symbol"].tolist(), f["fill_price"].tolist(), f["fill_quantity"].tolist()):
+        ts = int(timestamps[t])
+        if qty > 0:
+            fills.append((t, Trade(products[s], price, qty, SUBMISSION, "", ts)))
+        else:
+            fills.append((t, Trade(products[s], price, -qty, "", SUBMISSION, ts)))
+    return BacktestResult(products, f["days"], timestamps, f["pnl"], f["position"], fills)
+
+
+def default_cache(data_path: str) -> ResultCache:
+    return ResultCache(os.path.join(os.path.dirname(os.path.abspath(data_path)), CACHE_DIR, "backtests"))
+
+
+def cached_backtest(module: str, data_path: str, params: dict = None, fill: str = "none", cache: ResultCache = None,
+                    data=None) -> BacktestResult:
+    """run_backtest for module.Trader with parameter overrides, skipped when an identical run is on disk"""
+    cache = cache or default_cache(data_path)
+    key = backtest_key(module, data_path, params, fill)
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    data = data if data is not None else load_market_data(data_path)
+    trader = importlib.import_module(module).Trader()
+    apply_params(trader, params or {})
+    result = run_backtest(trader, data, fill_model=FILL_MODELS[fill](data))
+    cache.put(key, result)
+    return result
@@ -0,0 +1,135 @@
+import numpy as np
+import pandas as pd
+
+from backtest.data import MarketData, load_market_data
+from backtest.shared import MarketDataPool, SharedArrays, attach_arrays, worker_data
+from backtest.sweep import evaluate
+
+# robustness check on synthetic days built from a recorded file. every path keeps the file's ticks and
+# products, with
+#   - mids rebuilt from a block bootstrap of tick to tick mid changes. all products draw the same blocks,
+#     so baskets vs components and rock vs vouchers keep moving together
+#   - each row's book shape (levels and volumes relative to the mid) copied from a random recorded
+#     row of the same product
+# paths are generated a batch at a time into shared memory, workers wrap them in MarketData views.
+#
+#   table = monte_carlo("final_strategy", "data/round3.csv", 1000, {"VoucherStrategy.band_width": 4})
+#   summarize(table)
+
+PATH_COLUMNS = ["bid_price", "bid_volume", "ask_price", "ask_volume", "mid_price"]
+
+_worker_batch = (None, None, [])    # (batch name, arrays, attached blocks)
+
+
+def filled_mids(data: MarketData) -> np.ndarray:
+    """(ticks, products) recorded mids, gaps and non-positive mids filled from the neighbouring ticks"""
+    mids = data.matrix(data.mid_price, data.products)
+    mids[~(mids > 0)] = np.nan
+    return pd.DataFrame(mids).ffill().bfill().to_numpy()
+
+
+def bootstrap_paths(data: MarketData, n_paths: int, block: int = 50, rng=None) -> dict:
+    """PATH_COLUMNS arrays with a leading path axis, row layout identical to data"""
+    rng = rng if rng is not None else np.random.default_rng()
+    n_ticks = data.n_ticks
+    tick = data.tick_index()
+    product = data.product
+
+    # --- mids: block bootstrap of mid changes, shared block draws across products ---
+    mids = filled_mids(data)
+    steps = np.diff(mids, axis=0)
+    block = max(1, min(block, len(steps)))
+    n_blocks = -(-len(steps) // block)
+    starts = rng.integers(0, len(steps) - block + 1, size=(n_paths, n_blocks))
+    order = (starts[:, :, None] + np.arange(block)).reshape(n_paths, -1)[:, :len(steps)]
+    path_mids = np.empty((n_paths, n_ticks, len(data.products)))
+    path_mids[:, 0] = mids[0]
+    np.cumsum(steps[order], axis=1, out=path_mids[:, 1:])
+    path_mids[:, 1:] += mids[0]
+    np.maximum(path_mids, 1.0, out=path_mids)
+
+    # --- book shapes: every row copies a random two sided row of its own product ---
+    valid = (data.mid_price > 0) & np.isfinite(data.bid_price[:, 0]) & np.isfinite(data.ask_price[:, 0])
+    pool = np.flatnonzero(valid)
+    pool = pool[np.argsort(product[pool], kind="stable")]
+    counts = np.bincount(product[pool], minlength=len(data.products))
+    first = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    own = np.arange(len(product))
+    draw = (rng.random((n_paths, len(product))) * counts[product]).astype(np.int64)
+    src = np.where(counts[product] > 0, pool[np.minimum(first[product] + draw, len(pool) - 1)], own)
+
+    # prices sit on integer ticks: keep each level's offset from the floored mid
+    base = np.floor(data.mid_price)
+    new_base = np.floor(path_mids[:, tick, product])[..., None]
+    bid_price = new_base + (data.bid_price[src] - base[src][..., None])
+    ask_price = new_base + (data.ask_price[src] - base[src][..., None])
+    bid_price[bid_price < 1] = np.nan
+    ask_price[ask_price < 1] = np.nan
+
+    return {
+        "bid_price": bid_price,
+        "bid_volume": data.bid_volume[src],
+        "ask_price": ask_price,
+        "ask_volume": data.ask_volume[src],
+        "mid_price": new_base[..., 0] + (data.mid_price[src] - base[src]),
+    }
+
+
+def path_market_data(base: MarketData, paths: dict, i: int) -> MarketData:
+    return MarketData(base.day, base.timestamp, base.product, base.products,
+                      *(paths[c][i] for c in PATH_COLUMNS), tick_starts=base.tick_starts)
+
+
+def _batch_arrays(handle: dict) -> dict:
+    # keep one batch attached per worker, let go of the previous one when the next shows up
+    global _worker_batch
+    name = next(iter(handle["arrays"].values()))[0]
+    if _worker_batch[0] != name:
+        blocks = _worker_batch[2]
+        _worker_batch = (None, None, [])
+        for block in blocks:
+            block.close()
+        blocks = []
+        _worker_batch = (name, attach_arrays(handle, blocks), blocks)
+    return _worker_batch[1]
+
+
+def _evaluate_in_worker(task):
+    module, params, handle, i = task
+    data = path_market_data(worker_data(), _batch_arrays(handle), i)
+    return evaluate(module, params, data, metrics=True)
+
+
+def monte_carlo(module: str, data_path: str, n_paths: int = 1000, params: dict = None, block: int = 50,
+                workers: int = None, batch: int = 64, seed: int = 0) -> pd.DataFrame:
+    """backtest module.Trader (with params applied) on n_paths bootstrapped versions of data_path.
+    one row per path: the params, total_pnl, max_drawdown, sharpe and target_pnl for the strategies in
+    params (see sweep.evaluate)"""
+    params = params or {}
+    data = load_market_data(data_path)
+    rng = np.random.default_rng(seed)
+    rows = []
+
+    with MarketDataPool(data, workers) as pool:
+        for start in range(0, n_paths, batch):
+            size = min(batch, n_paths - start)
+            with SharedArrays(bootstrap_paths(data, size, block, rng)) as paths:
+                rows.extend(pool.map(_evaluate_in_worker, [(module, params, paths.handle, i) for i in range(size)]))
+
+    return pd.DataFrame(rows)
+
+
+def summarize(table: pd.DataFrame, ci: float = 0.95) -> dict:
+    """pnl distribution, drawdown quantiles and a percentile interval for sharpe across paths"""
+    lo, hi = (1 - ci) / 2, 1 - (1 - ci) / 2
+    pnl = table["total_pnl"]
+    return {
+        "paths": len(table),
+        "pnl_mean": float(pnl.mean()),
+        "pnl_std": float(pnl.std()),
+        "pnl_quantiles": {q: float(pnl.quantile(q)) for q in (0.05, 0.25, 0.5, 0.75, 0.95)},
+        "p_loss": float((pnl < 0).mean()),
+        "drawdown_quantiles": {q: float(table["max_drawdown"].quantile(q)) for q in (0.5, 0.9, 0.95, 0.99)},
+        "sharpe_median": float(table["sharpe"].median()),
+        "sharpe_ci": (float(table["sharpe"].quantile(lo)), float(table["sharpe"].quantile(hi))),
+    }
@@ -0,0 +1,107 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from backtest.data import ARRAY_COLUMNS, MarketData
+
+# blocks attached inside a worker stay referenced here so their buffers outlive the arrays.
+# pool workers share the parent's resource tracker, and only the creating process unlinks.
+_attached = []
+_worker_data = None
+
+
+class SharedArrays:
+    """Copies a dict of arrays into shared memory once; workers rebuild read-only views from `handle`."""
+
+    def __init__(self, arrays: dict, extra: dict = None):
+        self.blocks = []
+        specs = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+            self.blocks.append(block)
+            specs[name] = (block.name, array.shape, array.dtype.str)
+        self.handle = {"arrays": specs, "extra": extra or {}}
+
+    def close(self) -> None:
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+        self.blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_arrays(handle: dict, blocks: list = None) -> dict:
+    """blocks collects the attached SharedMemory objects, for callers that close them again"""
+    blocks = _attached if blocks is None else blocks
+    arrays = {}
+    for name, (block_name, shape, dtype) in handle["arrays"].items():
+        block = SharedMemory(name=block_name)
+        blocks.append(block)
+        array = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+        array.flags.writeable = False
+        arrays[name] = array
+    return arrays
+
+
+def share_market_data(data: MarketData) -> SharedArrays:
+    return SharedArrays({c: getattr(data, c) for c in ARRAY_COLUMNS}, extra={"products": data.products})
+
+
+def attach_market_data(handle: dict) -> MarketData:
+    return MarketData(products=handle["extra"]["products"], **attach_arrays(handle))
+
+
+
+def _init_pool_worker(handle):
+    global _worker_data
+    _worker_data = attach_market_data(handle)
+
+
+def worker_data() -> MarketData:
+    """the MarketData a MarketDataPool worker attached to at startup"""
+    return _worker_data
+
+
+class MarketDataPool:
+    """Process pool whose workers each attach one shared copy of data, read back with worker_data().
+
+        with MarketDataPool(data, workers) as pool:
+            rows = pool.map(_evaluate_in_worker, tasks)
+    """
+
+    def __init__(self, data: MarketData, workers: int = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.shared = share_market_data(data)
+        try:
+            self.pool = ProcessPoolExecutor(self.workers, initializer=_init_pool_worker,
+                                            initargs=(self.shared.handle,))
+        except BaseException:
+            self.shared.close()
+            raise
+
+    def map(self, fn, tasks) -> list:
+        # a few chunks per worker: fewer round trips, still balanced when task times vary
+        tasks = list(tasks)
+        chunksize = max(1, len(tasks) // (self.workers * 4))
+        return list(self.pool.map(fn, tasks, chunksize=chunksize))
+
+    def close(self) -> None:
+        try:
+            self.pool.shutdown()
+        finally:
+            self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,111 @@
+import contextlib
+import os
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from datamodel import Observation
+from backtest.data import LEVELS
+from backtest.engine import Replay, build_order_depth
+from backtest.fastmodel import Listing, TradingState
+
+# multi-day replay that never holds more than one csv chunk in memory. the dashboard files are written
+# in (day, timestamp) order, so a tick is complete as soon as the next (day, timestamp) shows up.
+
+BID_PRICE = [f"bid_price_{i}" for i in range(1, LEVELS + 1)]
+BID_VOLUME = [f"bid_volume_{i}" for i in range(1, LEVELS + 1)]
+ASK_PRICE = [f"ask_price_{i}" for i in range(1, LEVELS + 1)]
+ASK_VOLUME = [f"ask_volume_{i}" for i in range(1, LEVELS + 1)]
+
+
+def stream_ticks(paths, chunk_rows: int = 20000):
+    """yield (day, timestamp, depths, mids) across files in order, reading chunk_rows lines at a time"""
+    if isinstance(paths, str):
+        paths = [paths]
+
+    for path in paths:
+        key = None
+        depths = {}
+        mids = {}
+        for chunk in pd.read_csv(path, sep=";", chunksize=chunk_rows):
+            days = chunk["day"].tolist()
+            timestamps = chunk["timestamp"].tolist()
+            products = chunk["product"].tolist()
+            bid_price = chunk[BID_PRICE].to_numpy(dtype=np.float64).tolist()
+            bid_volume = chunk[BID_VOLUME].to_numpy(dtype=np.float64).tolist()
+            ask_price = chunk[ASK_PRICE].to_numpy(dtype=np.float64).tolist()
+            ask_volume = chunk[ASK_VOLUME].to_numpy(dtype=np.float64).tolist()
+            mid_price = chunk["mid_price"].tolist()
+
+            for row in range(len(days)):
+                row_key = (days[row], timestamps[row])
+                if row_key != key:
+                    if key is not None:
+                        yield key[0], key[1], depths, mids
+                    key = row_key
+                    depths = {}
+                    mids = {}
+                symbol = products[row]
+                depths[symbol] = build_order_depth(bid_price[row], bid_volume[row], ask_price[row], ask_volume[row])
+                mids[symbol] = mid_price[row]
+        if key is not None:
+            yield key[0], key[1], depths, mids
+
+
+def stream_states(paths, trader_data: str = "", chunk_rows: int = 20000):
+    """bare TradingStates with empty positions and trades, for feeding a trader outside of Replay"""
+    listings = {}
+    observations = Observation({}, {})
+    for _, timestamp, depths, _ in stream_ticks(paths, chunk_rows):
+        for symbol in depths:
+            if symbol not in listings:
+                listings[symbol] = Listing(symbol, symbol, "SEASHELLS")
+        yield TradingState(trader_data, timestamp, listings, depths, {}, {}, {}, observations)
+
+
+class StreamResult:
+    def __init__(self, days, day_pnl, total_pnl, n_fills):
+        self.days = days                # day number per tick, as an int32 array
+        self.day_pnl = day_pnl          # {day: {symbol: pnl accrued during that day}}
+        self.total_pnl = total_pnl      # float64 array, stitched pnl after every tick
+        self.n_fills = n_fills
+
+    def summary(self) -> str:
+        lines = []
+        for day, by_symbol in self.day_pnl.items():
+            lines.append(f"day {day:>3}{sum(by_symbol.values()):>14.1f}")
+        final = self.total_pnl[-1] if len(self.total_pnl) else 0.0
+        lines.append(f"{'TOTAL':<7}{final:>14.1f}")
+        return "\n".join(lines)
+
+
+def run_stream(trader, paths, limits: dict = None, fill_model=None, quiet: bool = True, chunk_rows: int = 20000,
+               conversion_feed=None) -> StreamResult:
+    """stitched replay of several days: positions and trader state carry across day boundaries.
+    only a per-tick total and a per-day breakdown are kept, so memory doesn't grow with the book"""
+    replay = Replay(trader, limits, fill_model, conversion_feed)
+
+    days = array("i")
+    total = array("d")
+    day_pnl = {}
+    day = None
+    day_open = {}
+
+    def close_day():
+        # pnl is marked to mid, so a day's share is the change since its open
+        if day is not None:
+            day_pnl[day] = {s: replay.pnl(s) - day_open.get(s, 0.0) for s in replay.cash}
+
+    with open(os.devnull, "w") as sink, (contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext()):
+        for tick_day, timestamp, depths, mids in stream_ticks(paths, chunk_rows):
+            if tick_day != day:
+                close_day()
+                day = tick_day
+                day_open = {s: replay.pnl(s) for s in replay.cash}
+            replay.step(timestamp, depths, mids)
+            days.append(day)
+            total.append(sum(replay.pnl(s) for s in replay.cash))
+        close_day()
+
+    return StreamResult(np.frombuffer(days, dtype=np.int32), day_pnl, np.frombuffer(total, dtype=np.float64), replay.n_fills)
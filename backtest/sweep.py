@@ -0,0 +1,98 @@
+import importlib
+import itertools
+import random
+
+import numpy as np
+import pandas as pd
+
+from backtest.data import load_market_data
+from backtest.engine import apply_params, run_backtest
+from backtest.matching import FILL_MODELS
+from backtest.memo import cached_backtest
+from backtest.shared import MarketDataPool, worker_data
+
+# example:
+#
+#   space = {
+#       "KelpStrategy": {"take_width": [0.5, 1, 2], "edge_width": [2, 3.5, 5]},
+#       "JamStrategy": {"threshold": (1.0, 2.5), "window": [20, 30, 60]},
+#   }
+#   table = sweep("final_strategy", "data/round3.csv", grid(space))
+#
+# list values are choices, (low, high) tuples are sampled uniformly by random_search.
+
+
+def flatten_space(space: dict) -> dict:
+    return {f"{cls}.{name}": values for cls, params in space.items() for name, values in params.items()}
+
+
+def grid(space: dict) -> list[dict]:
+    flat = flatten_space(space)
+    keys = list(flat)
+    return [dict(zip(keys, combo)) for combo in itertools.product(*(flat[k] for k in keys))]
+
+
+def random_search(space: dict, n: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    flat = flatten_space(space)
+
+    def sample(values):
+        if isinstance(values, tuple):
+            low, high = values
+            if isinstance(low, int) and isinstance(high, int):
+                return rng.randint(low, high)
+            return rng.uniform(low, high)
+        return rng.choice(values)
+
+    return [{k: sample(v) for k, v in flat.items()} for _ in range(n)]
+
+
+def path_metrics(pnl: np.ndarray) -> dict:
+    total = pnl.sum(axis=1)
+    steps = np.diff(total, prepend=0.0)
+    sd = steps.std()
+    return {
+        "total_pnl": float(total[-1]) if len(total) else 0.0,
+        "max_drawdown": float((np.maximum.accumulate(total) - total).max()) if len(total) else 0.0,
+        # per tick sharpe scaled to the length of the file
+        "sharpe": float(steps.mean() / sd * np.sqrt(len(steps))) if sd > 0 else 0.0,
+    }
+
+
+def evaluate(module: str, params: dict, data, data_path: str = None, fill: str = "none", use_cache: bool = False,
+             metrics: bool = False) -> dict:
+    """params plus total_pnl and target_pnl (pnl of the strategies params touch); metrics adds
+    max_drawdown and sharpe from path_metrics"""
+    trader = importlib.import_module(module).Trader()
+    apply_params(trader, params)
+    if use_cache and data_path is not None:
+        result = cached_backtest(module, data_path, params, fill, data=data)
+    else:
+        result = run_backtest(trader, data, fill_model=FILL_MODELS[fill](data))
+
+    swept = {key.split(".", 1)[0] for key in params}
+    symbols = [s for s, strategy in trader.strategies.items() if type(strategy).__name__ in swept]
+    final = result.final_pnl()
+    row = {**params, "total_pnl": result.total_pnl, "target_pnl": sum(final.get(s, 0.0) for s in symbols)}
+    if metrics:
+        row.update(path_metrics(result.pnl))
+    return row
+
+
+def _evaluate_in_worker(task):
+    module, params, data_path, fill, use_cache = task
+    return evaluate(module, params, worker_data(), data_path, fill, use_cache)
+
+
+def sweep(module: str, data_path: str, points: list[dict], workers: int = None, rank_by: str = "total_pnl",
+          fill: str = "none", use_cache: bool = True) -> pd.DataFrame:
+    """Backtest every parameter point across a process pool and return them ranked best first.
+    Points already run against the same code and data come straight from backtest.memo."""
+    data = load_market_data(data_path)
+    tasks = [(module, params, data_path, fill, use_cache) for params in points]
+
+    with MarketDataPool(data, workers) as pool:
+        rows = pool.map(_evaluate_in_worker, tasks)
+
+    table = pd.DataFrame(rows)
+    return table.sort_values(rank_by, ascending=False, ignore_index=True)
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from backtest.data import MarketData
+from final_strategy import implied_vols
+
+# implied vols and the quadratic smile for every voucher over a whole file, as a handful of array ops.
+# same model as VoucherPricer / VolSmile in final_strategy, so notebooks see what the trader sees.
+
+UNDERLYING = "VOLCANIC_ROCK"
+STRIKES = [9500, 9750, 10000, 10250, 10500]
+
+
+def smile_history(data: MarketData, strikes=STRIKES, T: float = 1 / 252, r: float = 0.0) -> pd.DataFrame:
+    K = np.asarray(strikes, dtype=float)
+    symbols = [UNDERLYING] + [f"VOLCANIC_ROCK_VOUCHER_{k}" for k in strikes]
+    mids = data.mid_matrix(symbols)
+    S = mids[:, :1]
+
+    iv = implied_vols(mids[:, 1:], S, K, T, r)
+    m = np.log(K / S) / np.sqrt(T)
+
+    # weighted least squares per tick, solved as one batch of 3x3 normal equations
+    ok = np.isfinite(iv)
+    X = np.stack([m * m, m, np.ones_like(m)], axis=-1) * ok[..., None]
+    y = np.where(ok, iv, 0.0)
+    XtX = np.einsum("tki,tkj->tij", X, X)
+    Xty = np.einsum("tki,tk->ti", X, y)
+    fit = ok.sum(axis=1) >= 3
+    coeffs = np.full((len(S), 3), np.nan)
+    coeffs[fit] = np.linalg.solve(XtX[fit], Xty[fit][..., None])[..., 0]
+
+    frame = {"day": data.tick_day, "timestamp": data.tick_timestamp, "rock_mid": S[:, 0]}
+    for j, k in enumerate(strikes):
+        frame[f"iv_{k}"] = iv[:, j]
+    frame["a"], frame["b"], frame["c"] = coeffs.T
+    return pd.DataFrame(frame)
@@ -0,0 +1,70 @@
+import pandas as pd
+
+from backtest.data import load_market_data
+from backtest.shared import MarketDataPool, worker_data
+from backtest.sweep import evaluate
+
+# walk-forward: pick parameters on a train window, trade them on the test window right after it,
+# slide both forward by step and repeat. only the test windows count, stitched end to end.
+#
+#   space = {"JamStrategy": {"threshold": [1.0, 1.5, 2.0]}, "VoucherStrategy": {"band_width": [3, 5, 8]}}
+#   table = walk_forward("final_strategy", "data/round3.csv", grid(space), train=400, test=100)
+#
+# windows are tick ranges sliced out of the one cached MarketData (see MarketData.slice_ticks), and
+# every (window, point) backtest runs on the pool against the shared copy. each window starts a fresh
+# Trader, so strategies warm up again at the start of every segment.
+
+
+def windows(n_ticks: int, train: int, test: int, step: int = None) -> list[tuple]:
+    """(train_start, test_start, test_end) tick ranges; step defaults to test so test windows tile"""
+    step = step or test
+    out = []
+    start = 0
+    while start + train + test <= n_ticks:
+        out.append((start, start + train, start + train + test))
+        start += step
+    return out
+
+
+def _evaluate_in_worker(task):
+    module, params, start, end = task
+    return evaluate(module, params, worker_data().slice_ticks(start, end))
+
+
+def walk_forward(module: str, data_path: str, points: list[dict], train: int, test: int, step: int = None,
+                 workers: int = None, rank_by: str = "total_pnl") -> pd.DataFrame:
+    """one row per window: the best train point, its train and out-of-sample score, and the
+    stitched out-of-sample total so far"""
+    data = load_market_data(data_path)
+    splits = windows(data.n_ticks, train, test, step)
+    if not splits:
+        raise ValueError(f"{data.n_ticks} ticks is too short for train={train} test={test}")
+
+    with MarketDataPool(data, workers) as pool:
+        # every train window x every point in one go
+        tasks = [(module, params, a, b) for a, b, _ in splits for params in points]
+        scores = pool.map(_evaluate_in_worker, tasks)
+
+        best = []
+        for w in range(len(splits)):
+            window_scores = scores[w * len(points):(w + 1) * len(points)]
+            i = max(range(len(points)), key=lambda k: window_scores[k][rank_by])
+            best.append((points[i], window_scores[i]))
+
+        tasks = [(module, params, b, c) for (_, b, c), (params, _) in zip(splits, best)]
+        tested = pool.map(_evaluate_in_worker, tasks)
+
+    rows = []
+    stitched = 0.0
+    for (a, b, c), (params, train_score), test_score in zip(splits, best, tested):
+        stitched += test_score[rank_by]
+        rows.append({
+            "train_start": int(data.tick_timestamp[a]),
+            "test_start": int(data.tick_timestamp[b]),
+            "test_end": int(data.tick_timestamp[c - 1]),
+            **params,
+            f"train_{rank_by}": train_score[rank_by],
+            f"test_{rank_by}": test_score[rank_by],
+            "oos_cumulative": stitched,
+        })
+    return pd.DataFrame(rows)
@@ -1,9 +1,14 @@
 from datamodel import Order, TradingState
 import numpy as np
 import math
+import json
+import time
+import struct
+import zlib
+import base64
+from bisect import bisect_left
+from itertools import accumulate
 from collections import defaultdict, deque
-import statistics
-from statistics import NormalDist
 from statistics import stdev
 from math import log, sqrt, exp
 from collections import deque
@@ -11,34 +16,657 @@ from collections import deque
 
 
 
+# rolling mean / sample stdev over a fixed window, O(1) per update
+class RollingStats:
+    def __init__(self, values=(), maxlen: int = 30) -> None:
+        self.values = deque(maxlen=maxlen)
+        self.maxlen = maxlen
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.updates = 0
+        for x in values:
+            self.append(x)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def append(self, x: float) -> None:
+        n = len(self.values)
+        if n < self.maxlen:
+            # welford add
+            delta = x - self.mean
+            self.mean += delta / (n + 1)
+            self.m2 += delta * (x - self.mean)
+        else:
+            # welford add + evict the oldest value in one step
+            old = self.values[0]
+            old_mean = self.mean
+            self.mean += (x - old) / n
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        self.values.append(x)
+
+        # wipe accumulated float drift once per full window, amortised O(1)
+        self.updates += 1
+        if self.updates >= self.maxlen:
+            self.updates = 0
+            self.mean = sum(self.values) / len(self.values)
+            self.m2 = sum((v - self.mean) ** 2 for v in self.values)
+
+    def variance(self) -> float:
+        n = len(self.values)
+        if n < 2:
+            return 0.0
+        return max(self.m2, 0.0) / (n - 1)
+
+    def stdev(self) -> float:
+        return sqrt(self.variance())
+
+
+
+
+# fixed-size numpy ring of prices with running mean / std and log-return std, O(1) per update
+class PriceRing:
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.prices = np.zeros(capacity)
+        self.returns = np.zeros(capacity - 1)
+        self.count = 0
+        self.head = 0
+        self.n_returns = 0
+        self.return_head = 0
+        self.last = None
+        self.shift = 0.0
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        self.return_sum = 0.0
+        self.return_sum_sq = 0.0
+        self.updates = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, price: float) -> None:
+        if self.last is None:
+            # sums are kept relative to the first price so sum_sq stays small
+            self.shift = price
+        x = price - self.shift
+
+        if self.count == self.capacity:
+            old = self.prices[self.head] - self.shift
+            self.sum -= old
+            self.sum_sq -= old * old
+        else:
+            self.count += 1
+        self.prices[self.head] = price
+        self.head = (self.head + 1) % self.capacity
+        self.sum += x
+        self.sum_sq += x * x
+
+        if self.last is not None and len(self.returns):
+            r = math.log(price / self.last)
+            if self.n_returns == len(self.returns):
+                old = self.returns[self.return_head]
+                self.return_sum -= old
+                self.return_sum_sq -= old * old
+            else:
+                self.n_returns += 1
+            self.returns[self.return_head] = r
+            self.return_head = (self.return_head + 1) % len(self.returns)
+            self.return_sum += r
+            self.return_sum_sq += r * r
+        self.last = price
+
+        # wipe accumulated float drift once per full ring, amortised O(1)
+        self.updates += 1
+        if self.updates >= self.capacity:
+            self.updates = 0
+            prices = self.prices[:self.count] - self.shift
+            self.sum = float(prices.sum())
+            self.sum_sq = float((prices * prices).sum())
+            returns = self.returns[:self.n_returns]
+            self.return_sum = float(returns.sum())
+            self.return_sum_sq = float((returns * returns).sum())
+
+    def values(self) -> np.ndarray:
+        """prices oldest first"""
+        if self.count < self.capacity:
+            return self.prices[:self.count].copy()
+        return np.roll(self.prices, -self.head)
+
+    def mean(self) -> float:
+        return self.shift + self.sum / self.count
+
+    def std(self) -> float:
+        mean = self.sum / self.count
+        var = self.sum_sq / self.count - mean * mean
+        # prices sit on a 0.5 tick grid, anything this small is a flat window
+        return math.sqrt(var) if var > 1e-9 else 0.0
+
+    def return_std(self) -> float:
+        if self.n_returns == 0:
+            return 0.0
+        mean = self.return_sum / self.n_returns
+        return math.sqrt(max(self.return_sum_sq / self.n_returns - mean * mean, 0.0))
+
+
+# sorted companion to an OrderDepth: levels are sorted once, then best / top-n / depth / filtered
+# lookups never rescan the dicts. buy_orders / sell_orders are the original dicts
+class BookView:
+    def __init__(self, order_depth) -> None:
+        self.buy_orders = order_depth.buy_orders
+        self.sell_orders = order_depth.sell_orders
+        # (price, volume) best first, ask volumes made positive
+        self.bids = sorted(order_depth.buy_orders.items(), reverse=True)
+        self.asks = sorted((p, -v) for p, v in order_depth.sell_orders.items())
+        self.bid_cum = None
+        self.ask_cum = None
+
+    @property
+    def best_bid(self):
+        return self.bids[0][0] if self.bids else None
+
+    @property
+    def best_ask(self):
+        return self.asks[0][0] if self.asks else None
+
+    def top_bids(self, n: int):
+        return self.bids[:n]
+
+    def top_asks(self, n: int):
+        return self.asks[:n]
+
+    @staticmethod
+    def cumulative(cum: list, n: int = None) -> int:
+        if not cum or n == 0:
+            return 0
+        return cum[-1] if n is None else cum[min(n, len(cum)) - 1]
+
+    def bid_depth(self, n: int = None) -> int:
+        # cumulative volume of the best n levels (all levels by default)
+        if self.bid_cum is None:
+            self.bid_cum = list(accumulate(v for _, v in self.bids))
+        return self.cumulative(self.bid_cum, n)
+
+    def ask_depth(self, n: int = None) -> int:
+        if self.ask_cum is None:
+            self.ask_cum = list(accumulate(v for _, v in self.asks))
+        return self.cumulative(self.ask_cum, n)
+
+    def best_bid_with_volume(self, min_volume: int):
+        # best bid backed by at least min_volume lots, i.e. a market maker rather than a one-lot
+        for price, volume in self.bids:
+            if volume >= min_volume:
+                return price
+        return None
+
+    def best_ask_with_volume(self, min_volume: int):
+        for price, volume in self.asks:
+            if volume >= min_volume:
+                return price
+        return None
+
+    def bid_below(self, price: float):
+        # highest bid strictly under price
+        for p, _ in self.bids:
+            if p < price:
+                return p
+        return None
+
+    def ask_above(self, price: float):
+        # lowest ask strictly over price
+        for p, _ in self.asks:
+            if p > price:
+                return p
+        return None
+
+
+
+
+# per tick view of the books, built once in Trader.run and shared by every strategy
+# so each symbol's book is only sorted on first use
+class MarketSnapshot:
+    def __init__(self, state: TradingState) -> None:
+        self.state = state
+        self.books = {}
+
+    def book(self, sym: str):
+        if sym not in self.books:
+            od = self.state.order_depths.get(sym)
+            self.books[sym] = BookView(od) if od is not None else None
+        return self.books[sym]
+
+    def best_bid(self, sym: str):
+        book = self.book(sym)
+        return book.best_bid if book else None
+
+    def best_ask(self, sym: str):
+        book = self.book(sym)
+        return book.best_ask if book else None
+
+    def mid(self, sym: str):
+        book = self.book(sym)
+        if not book or not book.bids or not book.asks:
+            return None
+        return (book.bids[0][0] + book.asks[0][0]) / 2
+
+    def spread(self, sym: str):
+        book = self.book(sym)
+        if not book or not book.bids or not book.asks:
+            return None
+        return book.asks[0][0] - book.bids[0][0]
+
+    def depth(self, sym: str):
+        book = self.book(sym)
+        if not book:
+            return 0, 0
+        return book.bid_depth(), book.ask_depth()
+
+
+
+
+# per tick signal DAG shared by the strategies. sources read the snapshot, nodes combine other signals.
+# nodes can only depend on names that already exist, so insertion order is a topological order.
+# a node reruns only when one of its inputs changed since its last run, unless it keeps state of its
+# own (always=True, e.g. a rolling window that must see every tick). a None input makes the node None.
+# a node with an owner is that strategy's work: with a LatencyMonitor it is skipped while the owner is
+# benched, and its time goes to cost[owner] so the watchdog charges the strategy rather than SIGNALS.
+# a source with symbols is None, without calling it, on ticks where none of them has a book, and so is
+# everything downstream of it; those nodes are left out of the tick altogether (see live)
+class SignalGraph:
+    def __init__(self) -> None:
+        # name -> (fn, inputs or None for a source, always, owner symbol or None, source symbols or None)
+        self.nodes = {}
+        self.values = {}
+        self.changed = {}
+        self.cost = {}
+        self.snapshot = None
+        self.symbols = frozenset()
+        self.trading = None
+        self.active = []
+
+    def source(self, name: str, fn, symbols=None) -> str:
+        # fn(snapshot) -> plain value compared with == to detect changes
+        if name not in self.nodes:
+            if symbols is not None:
+                symbols = frozenset(symbols)
+                self.symbols |= symbols
+            self.nodes[name] = (fn, None, True, None, symbols)
+            self.trading = None
+        return name
+
+    def mid(self, sym: str) -> str:
+        return self.source(f"{sym}.mid", lambda snapshot: snapshot.mid(sym), [sym])
+
+    def node(self, name: str, fn, inputs, always: bool = False, owner: str = None) -> str:
+        if name in self.nodes:
+            return name
+        for dep in inputs:
+            if dep not in self.nodes:
+                raise KeyError(f"{name} depends on unknown signal {dep}")
+        self.nodes[name] = (fn, list(inputs), always, owner, None)
+        self.trading = None
+        return name
+
+    def live(self, books) -> list:
+        # (name, node) pairs worth running while the same graph symbols trade; rebuilt when that set
+        # changes, which also sets the nodes left out to None
+        trading = self.symbols.intersection(books)
+        if trading != self.trading:
+            self.trading = trading
+            self.active = []
+            dead = set()
+            for name, node in self.nodes.items():
+                inputs, symbols = node[1], node[4]
+                if (symbols is not None and symbols.isdisjoint(trading)) or (inputs and not dead.isdisjoint(inputs)):
+                    dead.add(name)
+                    self.changed[name] = self.values.get(name) is not None
+                    self.values[name] = None
+                else:
+                    self.active.append((name, node))
+        return self.active
+
+    def evaluate(self, snapshot: MarketSnapshot, monitor=None) -> None:
+        if snapshot is self.snapshot:
+            return
+        self.snapshot = snapshot
+        values = self.values
+        changed = self.changed
+        cost = self.cost
+        cost.clear()
+
+        for name, (fn, inputs, always, owner, _) in self.live(snapshot.state.order_depths):
+            if inputs is None:
+                value = fn(snapshot)
+                changed[name] = name not in values or value != values[name]
+                values[name] = value
+                continue
+
+            if not always and name in values and not any(changed[dep] for dep in inputs):
+                changed[name] = False
+                continue
+            changed[name] = True
+            args = [values.get(dep) for dep in inputs]
+            if any(a is None for a in args):
+                values[name] = None
+            elif owner is None or monitor is None:
+                values[name] = fn(*args)
+            elif monitor.blocked(owner):
+                # dropped rather than left at None, so it reruns as soon as the owner is back
+                values.pop(name, None)
+            else:
+                start = time.perf_counter()
+                values[name] = fn(*args)
+                cost[owner] = cost.get(owner, 0.0) + time.perf_counter() - start
+
+    def __getitem__(self, name: str):
+        return self.values.get(name)
+
+
+
+
+# buffers orders / positions / signals for the tick and prints them as one compact json line in flush(),
+# orders stored column-wise so backtest.logs can load them straight into arrays
+class Logger:
+    DEBUG = 10
+    INFO = 20
+    WARN = 30
+
+    def __init__(self, level: int = INFO, max_length: int = 3750) -> None:
+        self.level = level
+        self.max_length = max_length
+        self.position_key = None
+        self.position_text = ""
+        self.reset()
+
+    def reset(self) -> None:
+        self.order_symbols = []
+        self.order_prices = []
+        self.order_quantities = []
+        self.position = {}
+        self.signals = {}
+        self.messages = []
+
+    def order(self, symbol: str, price: int, quantity: int) -> None:
+        if self.level <= self.INFO:
+            self.order_symbols.append(symbol)
+            self.order_prices.append(price)
+            self.order_quantities.append(quantity)
+
+    def positions(self, position: dict) -> None:
+        if self.level <= self.INFO:
+            self.position = position
+
+    def signal(self, name: str, value: float) -> None:
+        if self.level <= self.DEBUG:
+            self.signals[name] = round(float(value), 4)
+
+    def warn(self, message: str) -> None:
+        if self.level <= self.WARN:
+            self.messages.append(message)
+
+    def flush(self, timestamp: int) -> None:
+        # nothing recorded (or the level filtered it all out): no line at all
+        if not (self.order_symbols or self.position or self.signals or self.messages):
+            return
+        # the common line is built by hand, json.dumps only for the free-form parts. symbols are plain
+        # ascii, str() of the int lists is valid json, and positions rarely change so their text is kept
+        if self.position != self.position_key:
+            self.position_key = dict(self.position)
+            self.position_text = ",".join(f'"{k}":{v}' for k, v in self.position.items())
+        symbols = '"' + '","'.join(self.order_symbols) + '"' if self.order_symbols else ""
+        signals = json.dumps(self.signals, separators=(",", ":")) if self.signals else "{}"
+        messages = json.dumps(self.messages, separators=(",", ":")) if self.messages else "[]"
+        line = (f'{{"t":{timestamp},"p":{{{self.position_text}}},"o":[[{symbols}],{self.order_prices},'
+                f'{self.order_quantities}],"s":{signals},"m":{messages}}}')
+        if len(line) <= self.max_length:
+            print(line)
+            self.reset()
+            return
+
+        record = {
+            "t": timestamp,
+            "p": self.position,
+            "o": [self.order_symbols, self.order_prices, self.order_quantities],
+            "s": self.signals,
+            "m": self.messages,
+        }
+        line = json.dumps(record, separators=(",", ":"))
+        # over the exchange log limit, drop the least useful parts first
+        for key in ("s", "m"):
+            if len(line) <= self.max_length:
+                break
+            record[key] = {} if key == "s" else []
+            line = json.dumps(record, separators=(",", ":"))
+        if len(line) > self.max_length:
+            record["o"] = [[], [], []]
+            record["m"] = ["orders truncated"]
+            line = json.dumps(record, separators=(",", ":"))
+        print(line)
+        self.reset()
+
+
+logger = Logger()
+
+
+
+
+# packs registered strategy fields into traderData so state survives the exchange recycling the process.
+# layout: magic, version, flags, then per field [key len][key][tag][payload]; zlib'd when that is smaller
+class StateStore:
+    MAGIC = b"PS"
+    VERSION = 1
+    COMPRESSED = 1
+    # zlib only pays off on bigger payloads; a few hundred bytes cost more to compress than they save
+    COMPRESS_ABOVE = 4096
+    # sequences up to this long go through struct.pack, numpy only wins on longer ones
+    STRUCT_BELOW = 256
+
+    def __init__(self, max_length: int = 50000) -> None:
+        self.max_length = max_length
+        self.fields = {}
+        # key -> encoded bytes from the last dumps(), and the string they made
+        self.encoded = {}
+        self.last_out = None
+
+    def register(self, key: str, obj, attr: str, precision: str = "d", symbol: str = None) -> None:
+        # precision "f" stores float sequences as float32, enough for prices on a 0.5 grid.
+        # symbol: the field only changes on ticks that trade it, otherwise dumps() reuses its bytes
+        k = key.encode()
+        self.fields[key] = (obj, attr, precision, symbol, struct.pack("<B", len(k)) + k)
+
+    def encode_value(self, value, precision: str) -> bytes:
+        # windows are the common case, checked first
+        if isinstance(value, (deque, list, RollingStats, np.ndarray)):
+            values = value
+        elif isinstance(value, PriceRing):
+            # oldest first without the roll copy
+            prices = value.prices
+            values = prices[value.head:value.count].tolist() + prices[:value.head].tolist()
+        elif isinstance(value, (bool, int, np.integer)):
+            return b"q" + struct.pack("<q", int(value))
+        elif isinstance(value, (float, np.floating)):
+            return b"d" + struct.pack("<d", float(value))
+        else:
+            raise TypeError(f"cannot persist {type(value).__name__}")
+        n = len(values)
+        tag, code, dtype = (b"F", "f", "<f4") if precision == "f" else (b"A", "d", "<f8")
+        if n < self.STRUCT_BELOW:
+            return tag + struct.pack(f"<I{n}{code}", n, *values)
+        return tag + struct.pack("<I", n) + np.fromiter(values, dtype=float, count=n).astype(dtype).tobytes()
+
+    def decode_value(self, current, tag: bytes, buf: bytes, pos: int):
+        if tag == b"q":
+            return struct.unpack_from("<q", buf, pos)[0], pos + 8
+        if tag == b"d":
+            return struct.unpack_from("<d", buf, pos)[0], pos + 8
+
+        (n,) = struct.unpack_from("<I", buf, pos)
+        pos += 4
+        dtype = "<f4" if tag == b"F" else "<f8"
+        values = np.frombuffer(buf, dtype=dtype, count=n, offset=pos).astype(float)
+        pos += n * np.dtype(dtype).itemsize
+
+        # rebuild into the same container the strategy already holds
+        if isinstance(current, PriceRing):
+            ring = PriceRing(current.capacity)
+            for v in values[-current.capacity:]:
+                ring.append(float(v))
+            return ring, pos
+        if isinstance(current, RollingStats):
+            return RollingStats(values.tolist(), maxlen=current.maxlen), pos
+        if isinstance(current, deque):
+            return deque(values.tolist(), maxlen=current.maxlen), pos
+        if isinstance(current, np.ndarray):
+            return values, pos
+        return values.tolist(), pos
+
+    def dumps(self, active=None) -> str:
+        # active: the symbols trading this tick (e.g. state.order_depths). fields of other symbols
+        # didn't move, so their bytes from last time are reused; nothing re-encoded, same string
+        encoded = self.encoded
+        dirty = self.last_out is None
+        for key, (obj, attr, precision, symbol, prefix) in self.fields.items():
+            if active is not None and symbol is not None and symbol not in active and key in encoded:
+                continue
+            encoded[key] = prefix + self.encode_value(getattr(obj, attr), precision)
+            dirty = True
+        if not dirty:
+            return self.last_out
+        body = b"".join(encoded.values())
+
+        flags = 0
+        if len(body) > self.COMPRESS_ABOVE:
+            packed = zlib.compress(bytes(body), 1)
+            if len(packed) < len(body):
+                body, flags = packed, self.COMPRESSED
+        out = base64.b64encode(self.MAGIC + struct.pack("<BB", self.VERSION, flags) + bytes(body)).decode()
+
+        if len(out) > self.max_length:
+            logger.warn(f"traderData {len(out)} chars over limit, not saved")
+            out = ""
+        self.last_out = out
+        return out
+
+    def loads(self, data: str) -> None:
+        # anything unreadable (truncated, corrupt, other format) leaves the fresh state alone
+        if not data:
+            return
+        try:
+            values = self.parse(data)
+        except (ValueError, TypeError, struct.error, zlib.error, UnicodeDecodeError, IndexError):
+            logger.warn("unreadable traderData, starting fresh")
+            return
+        for (obj, attr), value in values:
+            setattr(obj, attr, value)
+        self.encoded = {}
+        self.last_out = None
+
+    def parse(self, data: str) -> list:
+        raw = base64.b64decode(data)
+        if raw[:2] != self.MAGIC:
+            return []
+        version, flags = struct.unpack_from("<BB", raw, 2)
+        if version != self.VERSION:
+            return []
+        buf = raw[4:]
+        if flags & self.COMPRESSED:
+            buf = zlib.decompress(buf)
+
+        values = []
+        pos = 0
+        while pos < len(buf):
+            n = buf[pos]
+            key = buf[pos + 1:pos + 1 + n].decode()
+            tag = buf[pos + 1 + n:pos + 2 + n]
+            field = self.fields.get(key)
+            current = getattr(field[0], field[1]) if field else None
+            value, pos = self.decode_value(current, tag, buf, pos + 2 + n)
+            if field:
+                values.append(((field[0], field[1]), value))
+        return values
+
+
 
 
 # inherited common methods
 class Strategy:
+    # attributes saved to traderData between ticks, see StateStore
+    persist = ()
+    # reuse_orders: step() hands back last tick's orders when the books and positions of inputs
+    # (None = just our own symbol) are unchanged. opt-in, only for strategies with no history of their
+    # own and an act() well above the ~1-2us fingerprint; on the replay files books rarely repeat
+    inputs = None
+    reuse_orders = False
+
     def __init__(self, symbol: str, limit: int) -> None:
         self.symbol = symbol
         self.limit = limit
         self.state = {}
         self.hedge_targets = defaultdict(int) 
-
-
-    def run(self, state: TradingState) -> list[Order]:
+        self.signals = None
+        self.last_fingerprint = None
+        self.last_orders = []
+
+    def fingerprint(self, state: TradingState) -> list:
+        # the book dicts themselves, compared with == next tick. every state comes with fresh dicts and
+        # nothing writes to them, so holding on to last tick's is safe and skips copying them
+        depths = state.order_depths
+        position = state.position
+        parts = []
+        for sym in self.inputs or (self.symbol,):
+            od = depths.get(sym)
+            if od is None:
+                parts += (None, None, position.get(sym, 0))
+            else:
+                parts += (od.buy_orders, od.sell_orders, position.get(sym, 0))
+        return parts
+
+    def step(self, state: TradingState, snapshot: MarketSnapshot = None) -> list[Order]:
+        # run(), or last tick's orders (and conversions) again when none of our inputs changed
+        if not self.reuse_orders:
+            return self.run(state, snapshot)
+        key = self.fingerprint(state)
+        if key == self.last_fingerprint:
+            for order in self.last_orders:
+                logger.order(self.symbol, order.price, order.quantity)
+            return self.last_orders
+        self.last_fingerprint = key
+        self.last_orders = self.run(state, snapshot)
+        return self.last_orders
+
+
+    def run(self, state: TradingState, snapshot: MarketSnapshot = None) -> list[Order]:
         self.orders = []
+        self.conversions = 0
+        self.snapshot = snapshot or MarketSnapshot(state)
+        if self.signals is None:
+            # running outside Trader: a private graph with just this strategy's signals
+            self.signals = SignalGraph()
+            self.register_signals(self.signals)
+        self.signals.evaluate(self.snapshot)
         return self.act(state)
 
+    def register_signals(self, graph: SignalGraph) -> None:
+        # add the sources / nodes act() reads from self.signals; shared names are only added once
+        pass
+
     def buy(self, price: int, quantity: int) -> None:
-        print(f"[BUY] {self.symbol}: {quantity} @ {price}")
+        logger.order(self.symbol, int(price), quantity)
         self.orders.append(Order(self.symbol, int(price), quantity))
 
     def sell(self, price: int, quantity: int) -> None:
-        print(f"[SELL] {self.symbol}: {quantity} @ {price}")
+        logger.order(self.symbol, int(price), -quantity)
         self.orders.append(Order(self.symbol, int(price), -quantity))
     
     def get_mid_price(self, state: TradingState, sym: str):
-        od = state.order_depths.get(sym)
-        if not od or not od.buy_orders or not od.sell_orders:
-            return None
-        return (max(od.buy_orders) + min(od.sell_orders)) / 2
+        return self.snapshot.mid(sym)
+
+    def degrade(self) -> bool:
+        # called by the latency watchdog when act() runs over budget; return True if it now does less work
+        return False
 
 
 
@@ -66,8 +694,8 @@ class ResinStrategy(Strategy):
          sell_volume = 0
 
          # MARKET TAKE, BUY AND SELL ON THE EDGE
-         best_ask = min(order_depth.sell_orders.keys(), default=None)
-         best_bid = max(order_depth.buy_orders.keys(), default=None)
+         best_ask = self.snapshot.best_ask(self.symbol)
+         best_bid = self.snapshot.best_bid(self.symbol)
 
          if best_ask is not None and best_ask <= self.fair_value - self.take_width:
              quantity = min(-order_depth.sell_orders[best_ask], self.limit - position)
@@ -101,11 +729,12 @@ class ResinStrategy(Strategy):
              buy_volume += max_qty
 
          # MARKET MAKE, FIND A LARGE SPREAD AND PLACE ORDERS JUST INSIDE OF IT
-         book_asks = [p for p in order_depth.sell_orders if p > self.fair_value + self.edge_width - 1]
-         book_bids = [p for p in order_depth.buy_orders if p < self.fair_value - self.edge_width + 1]
+         book = self.snapshot.book(self.symbol)
+         book_ask = book.ask_above(self.fair_value + self.edge_width - 1)
+         book_bid = book.bid_below(self.fair_value - self.edge_width + 1)
 
-         ask_quote = min(book_asks, default=self.fair_value + self.edge_width) - 1
-         bid_quote = max(book_bids, default=self.fair_value - self.edge_width) + 1
+         ask_quote = (book_ask if book_ask is not None else self.fair_value + self.edge_width) - 1
+         bid_quote = (book_bid if book_bid is not None else self.fair_value - self.edge_width) + 1
 
          buy_qty = self.limit - (position + buy_volume)
          sell_qty = self.limit + (position - sell_volume)
@@ -124,17 +753,44 @@ class ResinStrategy(Strategy):
 
 # #volatile
 class KelpStrategy(Strategy):
+ persist = ("tick", "kelp_prices", "kelp_vwap", "kelp_volume")
+
  def __init__(self, symbol: str, limit: int) -> None:
      super().__init__(symbol, limit)
      self.take_width = 1
      self.edge_width = 3.5
      self.tick = 0
-     self.kelp_prices = []
-     self.kelp_vwap = []
+     self.window = 20
+     # last window filtered mids, vwaps and book volumes; resize() rebuilds them when window changes
+     # or traderData swapped them out, and redoes the running sums behind the window vwap
+     self.kelp_prices = deque(maxlen=self.window)
+     self.kelp_vwap = deque(maxlen=self.window)
+     self.kelp_volume = deque(maxlen=self.window)
+     self.sum_pv = 0.0
+     self.sum_volume = 0.0
+     self.updates = 0
+     self.synced = None
+     # quote around the window vwap instead of the filtered mid
+     self.use_vwap = False
+
+ def resize(self) -> None:
+     self.kelp_prices = deque(self.kelp_prices, maxlen=self.window)
+     self.kelp_vwap = deque(self.kelp_vwap, maxlen=self.window)
+     self.kelp_volume = deque(self.kelp_volume, maxlen=self.window)
+     self.synced = self.kelp_volume
+     self.resum()
+
+ def resum(self) -> None:
+     # also wipes accumulated float drift, once per full window
+     self.sum_pv = sum(p * v for p, v in zip(self.kelp_vwap, self.kelp_volume))
+     self.sum_volume = float(sum(self.kelp_volume))
+     self.updates = 0
 
  def act(self, state: TradingState) -> list[Order]:
      
      self.tick += 1
+     if self.synced is not self.kelp_volume or self.kelp_volume.maxlen != self.window:
+         self.resize()
 
      order_depth = state.order_depths[self.symbol]
      position = state.position.get(self.symbol, 0)
@@ -142,15 +798,17 @@ class KelpStrategy(Strategy):
      if not order_depth.buy_orders or not order_depth.sell_orders:
          return []
      
-     best_ask = min(order_depth.sell_orders.keys())
-     best_bid = max(order_depth.buy_orders.keys())
+     best_ask = self.snapshot.best_ask(self.symbol)
+     best_bid = self.snapshot.best_bid(self.symbol)
 
      # --- Filtered Fair Value ---
-     filtered_asks = [p for p in order_depth.sell_orders if -order_depth.sell_orders[p] >= 15]
-     filtered_bids = [p for p in order_depth.buy_orders if order_depth.buy_orders[p] >= 15]
-
-     mm_ask = min(filtered_asks) if filtered_asks else best_ask
-     mm_bid = max(filtered_bids) if filtered_bids else best_bid
+     book = self.snapshot.book(self.symbol)
+     mm_ask = book.best_ask_with_volume(15)
+     mm_bid = book.best_bid_with_volume(15)
+     if mm_ask is None:
+         mm_ask = best_ask
+     if mm_bid is None:
+         mm_bid = best_bid
 
      mmmid_price = (mm_bid + mm_ask) / 2
      self.kelp_prices.append(mmmid_price)
@@ -162,14 +820,21 @@ class KelpStrategy(Strategy):
      else:
          vwap = mmmid_price
 
-     self.kelp_vwap.append({"vol": volume, "vwap": vwap})
-
-     if len(self.kelp_prices) > 20:
-         self.kelp_prices.pop(0)
-
-     if len(self.kelp_vwap) > 20:
-         self.kelp_vwap.pop(0)
-     fair_value = mmmid_price 
+     if len(self.kelp_volume) == self.window:
+         self.sum_pv -= self.kelp_vwap[0] * self.kelp_volume[0]
+         self.sum_volume -= self.kelp_volume[0]
+     self.kelp_vwap.append(vwap)
+     self.kelp_volume.append(volume)
+     self.sum_pv += vwap * volume
+     self.sum_volume += volume
+     self.updates += 1
+     if self.updates >= self.window:
+         self.resum()
+
+     if self.use_vwap and self.sum_volume:
+         fair_value = self.sum_pv / self.sum_volume
+     else:
+         fair_value = mmmid_price
 
      buy_volume = 0
      sell_volume = 0
@@ -213,11 +878,12 @@ class KelpStrategy(Strategy):
              buy_volume += clear_qty
 
      # --- Market Making ---
-     aaf = [p for p in order_depth.sell_orders if p > fair_value + 1]
-     bbf = [p for p in order_depth.buy_orders if p < fair_value - 1]
-
-     baaf = min(aaf) if aaf else fair_value + 2
-     bbbf = max(bbf) if bbf else fair_value - 2
+     baaf = book.ask_above(fair_value + 1)
+     bbbf = book.bid_below(fair_value - 1)
+     if baaf is None:
+         baaf = fair_value + 2
+     if bbbf is None:
+         bbbf = fair_value - 2
 
      buy_qty = self.limit - (position + buy_volume)
      sell_qty = self.limit + (position - sell_volume)
@@ -233,6 +899,63 @@ class KelpStrategy(Strategy):
 
 
 
+# baskets x components recipe matrix R. per tick, with basket mids b and component mids c:
+#   premium   = b - R @ c                      (what a basket trades over its parts)
+#   synthetic = c + premium / R                (component price implied by each basket, nan where unused)
+# shared by both BasketStrategy instances and JamStrategy, evaluated once per snapshot
+BASKET_RECIPES = {
+    "PICNIC_BASKET1": {"CROISSANTS": 6, "JAMS": 3, "DJEMBES": 1},
+    "PICNIC_BASKET2": {"CROISSANTS": 4, "JAMS": 2},
+}
+
+
+class RecipeMatrix:
+    def __init__(self, recipes: dict = BASKET_RECIPES) -> None:
+        self.baskets = list(recipes)
+        self.components = list(dict.fromkeys(c for recipe in recipes.values() for c in recipe))
+        self.symbols = self.baskets + self.components
+        self.basket_index = {b: i for i, b in enumerate(self.baskets)}
+        self.component_index = {c: j for j, c in enumerate(self.components)}
+        self.R = np.array([[recipes[b].get(c, 0) for c in self.components] for b in self.baskets], dtype=float)
+        self.used = self.R != 0
+        with np.errstate(divide="ignore"):
+            self.inverse = np.where(self.used, 1.0 / self.R, np.nan)
+
+    def evaluate(self, basket_mids, component_mids):
+        """(premium, synthetic) for one tick, or rows of ticks: b (..., baskets), c (..., components).
+        a missing (nan) mid only blanks the baskets that use it"""
+        b = np.asarray(basket_mids, dtype=float)
+        c = np.asarray(component_mids, dtype=float)
+        missing = np.isnan(c)
+        premium = b - np.where(missing, 0.0, c) @ self.R.T
+        premium = np.where(missing.astype(float) @ self.used.T > 0, np.nan, premium)
+        synthetic = c[..., None, :] + premium[..., :, None] * self.inverse
+        return premium, synthetic
+
+    def mids(self, snapshot: MarketSnapshot) -> tuple:
+        # baskets then components, nan where a book is one sided
+        mids = [snapshot.mid(sym) for sym in self.symbols]
+        return tuple(np.nan if m is None else m for m in mids)
+
+    def evaluate_mids(self, mids: tuple):
+        n = len(self.baskets)
+        return self.evaluate(mids[:n], mids[n:])
+
+    def register_signals(self, graph: SignalGraph) -> str:
+        graph.source("baskets.mids", self.mids, self.symbols)
+        return graph.node("baskets", self.evaluate_mids, ["baskets.mids"])
+
+    def premium(self, values, basket: str):
+        value = values[0][self.basket_index[basket]]
+        return None if np.isnan(value) else float(value)
+
+    def synthetic(self, values, component: str):
+        """implied price of component from every basket that contains it, None if any of them is missing"""
+        j = self.component_index[component]
+        column = values[1][self.used[:, j], j]
+        return None if np.isnan(column).any() else column
+
+
 #volatile with only 1-2 active participants
 # super volatile pnl need to clean this up
 class SquidInkStrategy(Strategy):
@@ -248,44 +971,37 @@ class SquidInkStrategy(Strategy):
 class BasketStrategy(Strategy):
     def __init__(self, symbol: str, limit: int):
         super().__init__(symbol, limit)
-        self.component_recipes = {
-            "PICNIC_BASKET1": {"CROISSANTS": 6, "JAMS": 3, "DJEMBES": 1},
-            "PICNIC_BASKET2": {"CROISSANTS": 4, "JAMS": 2},
-        }
+        self.recipes = RecipeMatrix()
+        self.inputs = tuple(self.recipes.baskets + self.recipes.components)
         self.threshold = 20
 
+    def register_signals(self, graph: SignalGraph) -> None:
+        self.recipes.register_signals(graph)
+
     def act(self, state: TradingState) -> list[Order]:
         self.orders = []
-        if self.symbol not in self.component_recipes:
+        if self.symbol not in self.recipes.basket_index:
             return []
 
-        components = self.component_recipes[self.symbol]
         od = state.order_depths.get(self.symbol)
         if not od:
             return []
 
-        basket_mid = self.get_mid_price(state, self.symbol)
-        if basket_mid is None:
+        values = self.signals["baskets"]
+        diff = self.recipes.premium(values, self.symbol) if values is not None else None
+        if diff is None:
             return []
 
-        component_value = 0
-        for sym, qty in components.items():
-            comp_mid = self.get_mid_price(state, sym)
-            if comp_mid is None:
-                return []
-            component_value += qty * comp_mid
-
-        diff = basket_mid - component_value
         position = state.position.get(self.symbol, 0)
 
         if diff > self.threshold:
-            price = max(od.buy_orders)  
+            price = self.snapshot.best_bid(self.symbol)
             qty = min(abs(od.buy_orders.get(price, 0)), self.limit + position)
             if qty > 0:
                 self.sell(price, qty)
 
         elif diff < -self.threshold:
-            price = min(od.sell_orders)  
+            price = self.snapshot.best_ask(self.symbol)
             qty = min(abs(-od.sell_orders.get(price, 0)), self.limit - position)
             if qty > 0:
                 self.buy(price, qty)
@@ -319,59 +1035,62 @@ class CroissantStrategy(Strategy):
 
 # ---------- Component Strategy for JAMS ----------
 class JamStrategy(Strategy):
+    persist = ("window",)
+
     def __init__(self, symbol: str, limit: int):
         super().__init__(symbol, limit)
-        self.window = deque(maxlen=30)
+        self.window = RollingStats(maxlen=30)
         self.threshold = 1.5
         self.buffer = 10
+        self.recipes = RecipeMatrix()
 
-    def act(self, state: TradingState) -> list[Order]:
-        order_depth = state.order_depths[self.symbol]
-        position = state.position.get(self.symbol, 0)
-
-        if not order_depth.buy_orders or not order_depth.sell_orders:
-            return []
+    def register_signals(self, graph: SignalGraph) -> None:
+        # basket mids -> synthetic jam -> spread to the jam mid -> z-score over the window
+        baskets = self.recipes.register_signals(graph)
+        spread = graph.node(f"{self.symbol}.spread", self.spread, [baskets, graph.mid(self.symbol)], owner=self.symbol)
+        graph.node(f"{self.symbol}.z", self.zscore, [spread], always=True, owner=self.symbol)
 
-        best_bid = max(order_depth.buy_orders)
-        best_ask = min(order_depth.sell_orders)
-        mid_price = (best_bid + best_ask) / 2
-
-        def mid(sym):
-            d = state.order_depths.get(sym, None)
-            if not d or not d.buy_orders or not d.sell_orders:
-                return None
-            return (max(d.buy_orders) + min(d.sell_orders)) / 2
-
-        b1 = mid("PICNIC_BASKET1")
-        b2 = mid("PICNIC_BASKET2")
-        c = mid("CROISSANTS")
-        d = mid("DJEMBES")
-
-        if None in [b1, b2, c, d]:
-            return []
+    def spread(self, values, mid_price: float):
+        synthetic = self.recipes.synthetic(values, self.symbol)
+        if synthetic is None:
+            return None
 
-        synth_jam_1 = (b1 - 6 * c - d) / 3
-        synth_jam_2 = (b2 - 4 * c) / 2
+        synth_jam_1, synth_jam_2 = synthetic
         spread1 = synth_jam_1 - mid_price
         spread2 = synth_jam_2 - mid_price
 
         if not (spread1 * spread2 > 20):  
-            return []
-
+            return None
 
+        return ((synth_jam_1 + synth_jam_2) / 2) - mid_price
 
-        spread = ((synth_jam_1 + synth_jam_2) / 2) - mid_price
+    def zscore(self, spread: float):
         self.window.append(spread)
 
         if len(self.window) < self.window.maxlen:
-            return []
+            return None
 
-        mean = statistics.mean(self.window)
-        stdev = statistics.stdev(self.window)
+        stdev = self.window.stdev()
         if stdev == 0:
+            return None
+
+        return (spread - self.window.mean) / stdev
+
+    def act(self, state: TradingState) -> list[Order]:
+        order_depth = state.order_depths[self.symbol]
+        position = state.position.get(self.symbol, 0)
+
+        if not order_depth.buy_orders or not order_depth.sell_orders:
             return []
 
-        zscore = (spread - mean) / stdev
+        best_bid = self.snapshot.best_bid(self.symbol)
+        best_ask = self.snapshot.best_ask(self.symbol)
+
+        zscore = self.signals[f"{self.symbol}.z"]
+        if zscore is None:
+            return []
+
+        logger.signal("JAMS.z", zscore)
 
         if zscore > self.threshold:
             vol = min(order_depth.buy_orders.get(best_bid, 0), self.limit - position - self.buffer)
@@ -399,67 +1118,277 @@ class DjembeStrategy(Strategy):
 
 
 
+# --- Batch Black-Scholes ---
+# abramowitz & stegun 7.1.26 erf, |error| < 1.5e-7, so a 10k rock moves prices by < 0.002
+def norm_cdf(x):
+    x = np.asarray(x, dtype=float)
+    z = np.abs(x) / math.sqrt(2)
+    t = 1 / (1 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-z * z)
+    return 0.5 * (1 + np.sign(x) * erf)
+
+
+def norm_pdf(x):
+    return np.exp(-0.5 * np.asarray(x, dtype=float) ** 2) / math.sqrt(2 * math.pi)
+
+
+# below this many strikes a python loop over math.erf beats paying numpy's per-op overhead ~20 times
+SCALAR_STRIKES = 16
+
+
+def black_scholes_calls(S, strikes, T, r, sigma, greeks: bool = False):
+    """call prices on every strike, or (price, delta, gamma, vega) with greeks; S, strikes and sigma broadcast"""
+    K = np.asarray(strikes, dtype=float)
+    # np.float64 is a float, so scalars straight out of PriceRing take the short path too
+    plain = T > 0 and isinstance(S, (int, float)) and isinstance(sigma, (int, float)) and sigma > 0
+
+    if plain and not greeks:
+        S, sigma = float(S), float(sigma)
+        vol = sigma * math.sqrt(T)
+        drift = (r + 0.5 * sigma * sigma) * T
+        discount = math.exp(-r * T)
+        if K.ndim == 1 and len(K) <= SCALAR_STRIKES:
+            erf, root2 = math.erf, math.sqrt(2)
+            out = []
+            for k in K.tolist():
+                d1 = (math.log(S / k) + drift) / vol
+                out.append(0.5 * (S * (1 + erf(d1 / root2)) - k * discount * (1 + erf((d1 - vol) / root2))))
+            return np.array(out)
+        d1 = (np.log(S / K) + drift) / vol
+        return S * norm_cdf(d1) - K * discount * norm_cdf(d1 - vol)
+
+    S = np.asarray(S, dtype=float)
+    sigma = np.asarray(sigma, dtype=float)
+    shape = np.broadcast_shapes(S.shape, K.shape, sigma.shape)
+
+    live = np.broadcast_to(sigma > 0, shape) if T > 0 else np.zeros(shape, dtype=bool)
+    sigma = np.where(live, sigma, 1.0)
+    vol = sigma * math.sqrt(max(T, 0.0))
+    vol = np.where(live, vol, 1.0)
+    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / vol
+    d2 = d1 - vol
+    discount = math.exp(-r * T)
+    cdf1 = norm_cdf(d1)
+
+    # expired / zero vol strikes fall back to intrinsic value
+    intrinsic = np.maximum(S - K, 0.0)
+    price = np.where(live, S * cdf1 - K * discount * norm_cdf(d2), intrinsic)
+    if not greeks:
+        return price
+    pdf1 = norm_pdf(d1)
+    delta = np.where(live, cdf1, (S > K).astype(float))
+    gamma = np.where(live, pdf1 / (S * vol), 0.0)
+    vega = np.where(live, S * pdf1 * math.sqrt(max(T, 0.0)), 0.0)
+    return price, delta, gamma, vega
+
+
+def call_price_vega(S, K, T, r, sigma):
+    """just what the iv solver needs: (price, vega) for live calls, T > 0 and sigma > 0"""
+    sqrt_t = math.sqrt(T)
+    vol = sigma * sqrt_t
+    d1 = (np.log(S / K) + (r + 0.5 * sigma * sigma) * T) / vol
+    price = S * norm_cdf(d1) - K * math.exp(-r * T) * norm_cdf(d1 - vol)
+    return price, S * norm_pdf(d1) * sqrt_t
+
+
+def implied_vol(price: float, S: float, k: float, T: float, r: float, sigma: float = 0.2,
+                tol: float = 1e-4, vol_tol: float = 1e-5, max_iter: int = 50) -> float:
+    """scalar version of implied_vols, for a handful of strikes where numpy's per-op overhead dominates"""
+    discount = math.exp(-r * T)
+    if not (price > max(S - k * discount, 0.0) and price < S):
+        return math.nan
+    erf, root2 = math.erf, math.sqrt(2)
+    sqrt_t = math.sqrt(T)
+    pdf_scale = S * sqrt_t / math.sqrt(2 * math.pi)
+    log_moneyness = math.log(S / k)
+    lo, hi = 1e-4, 5.0
+    sigma = min(max(sigma, lo), hi) if sigma == sigma else 0.2
+
+    for _ in range(max_iter):
+        vol = sigma * sqrt_t
+        d1 = (log_moneyness + (r + 0.5 * sigma * sigma) * T) / vol
+        diff = 0.5 * (S * (1 + erf(d1 / root2)) - k * discount * (1 + erf((d1 - vol) / root2))) - price
+        vega = pdf_scale * math.exp(-0.5 * d1 * d1)
+        if abs(diff) < tol or abs(diff) < vol_tol * vega:
+            break
+        if diff > 0:
+            hi = sigma
+        else:
+            lo = sigma
+        newton = sigma - diff / vega if vega > 1e-8 else lo
+        sigma = newton if lo < newton < hi else 0.5 * (lo + hi)
+    return sigma
+
+
+def implied_vols(prices, S, strikes, T, r, guess=None, tol=1e-4, vol_tol=1e-5, max_iter=50):
+    """invert call prices for every strike at once; newton steps, bisection when newton leaves the bracket.
+    a strike is done once it prices within tol or the next newton step is under vol_tol.
+    prices outside the no-arbitrage band come back as nan"""
+    prices = np.asarray(prices, dtype=float)
+    K = np.asarray(strikes, dtype=float)
+
+    if T > 0 and isinstance(S, (int, float)) and prices.ndim == 1 and prices.shape == K.shape and len(K) <= SCALAR_STRIKES:
+        guesses = [0.2] * len(K) if guess is None else np.broadcast_to(guess, K.shape).tolist()
+        return np.array([implied_vol(p, S, k, T, r, g, tol, vol_tol, max_iter)
+                         for p, k, g in zip(prices.tolist(), K.tolist(), guesses)])
+
+    S = np.asarray(S, dtype=float)
+    shape = np.broadcast_shapes(prices.shape, S.shape, K.shape)
+    prices = np.broadcast_to(prices, shape)
+
+    lower = np.maximum(S - K * math.exp(-r * T), 0.0)
+    valid = np.isfinite(prices) & (prices > lower) & (prices < S)
+
+    lo = np.full(shape, 1e-4)
+    hi = np.full(shape, 5.0)
+    sigma = np.full(shape, 0.2) if guess is None else np.clip(np.broadcast_to(guess, shape), 1e-4, 5.0).astype(float)
+    sigma = np.where(np.isfinite(sigma), sigma, 0.2)
+
+    for _ in range(max_iter):
+        if T > 0:
+            price, vega = call_price_vega(S, K, T, r, sigma)
+        else:
+            price, _, _, vega = black_scholes_calls(S, K, T, r, sigma, greeks=True)
+        diff = price - prices
+        step = np.abs(diff)
+        done = ~valid | (step < tol) | (step < vol_tol * vega)
+        if done.all():
+            break
+        hi = np.where(diff > 0, sigma, hi)
+        lo = np.where(diff <= 0, sigma, lo)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = sigma - diff / vega
+        inside = (vega > 1e-8) & (newton > lo) & (newton < hi)
+        sigma = np.where(done, sigma, np.where(inside, newton, 0.5 * (lo + hi)))
+
+    return np.where(valid, sigma, np.nan)
+
+
+# quadratic implied vol smile in moneyness log(K/S)/sqrt(T), warm started from the previous tick's fit
+class VolSmile:
+    def __init__(self, strikes, T: float, r: float = 0.0) -> None:
+        self.strikes = np.asarray(strikes, dtype=float)
+        self.T = T
+        self.r = r
+        self.coeffs = None
+        self.iv = None
+
+    def moneyness(self, S, strikes=None):
+        strikes = self.strikes if strikes is None else np.asarray(strikes, dtype=float)
+        return np.log(strikes / S) / math.sqrt(self.T)
+
+    def update(self, S: float, prices):
+        m = self.moneyness(S)
+        # last tick's vols are usually within a newton step or two; the fitted smile fills gaps
+        guess = np.polyval(self.coeffs, m) if self.coeffs is not None else None
+        if self.iv is not None:
+            guess = np.where(np.isfinite(self.iv), self.iv, np.nan if guess is None else guess)
+        iv = implied_vols(prices, S, self.strikes, self.T, self.r, guess)
+        self.iv = iv
+
+        ok = np.isfinite(iv)
+        if ok.sum() >= 3:
+            self.coeffs = np.polyfit(m[ok], iv[ok], 2)
+        return self.coeffs
+
+    def vol(self, S: float, strikes=None):
+        if self.coeffs is None:
+            return None
+        return np.polyval(self.coeffs, self.moneyness(S, strikes))
+
+
+# prices every voucher strike in one call per tick, shared by all VoucherStrategy instances
+class VoucherPricer:
+    def __init__(self, strikes, window: int = 30) -> None:
+        self.strikes = np.array(sorted(set(strikes)), dtype=float)
+        self.index = {int(k): i for i, k in enumerate(self.strikes)}
+        self.symbols = [f"VOLCANIC_ROCK_VOUCHER_{int(k)}" for k in self.strikes]
+        self.window = window
+        self.rock_history = PriceRing(window)
+        self.r = 0.0
+        self.T = 1 / 252
+        self.fair = None
+        # price off the fitted implied vol smile instead of realized rock vol
+        self.use_smile = False
+        self.smile = VolSmile(self.strikes, self.T, self.r)
+
+    def estimate_volatility(self, prices: PriceRing):
+        if len(prices) < 2:
+            return 0.01
+        return max(0.01, prices.return_std())
+
+    def mids(self, snapshot: MarketSnapshot) -> tuple:
+        mids = [snapshot.mid(sym) for sym in self.symbols]
+        return tuple(np.nan if m is None else m for m in mids)
+
+    def register_signals(self, graph: SignalGraph, owner: str = None) -> str:
+        # rock mid -> smoothed rock + vol -> black-scholes fair value per strike. rock_history has to see
+        # every tick, so this reruns even when the mids repeat. owner is the voucher billed for it
+        # rock counts too: while it trades, update() keeps rock_history fed even with no voucher books
+        graph.source("vouchers.mids", self.mids, self.symbols + ["VOLCANIC_ROCK"])
+        return graph.node("vouchers.fair", self.update, [graph.mid("VOLCANIC_ROCK"), "vouchers.mids"],
+                          always=True, owner=owner)
+
+    def update(self, rock_mid: float, mids: tuple):
+        # fair call prices ordered like self.strikes, None while warming up
+        self.fair = None
+        self.rock_history.append(rock_mid)
+        if len(self.rock_history) < self.window:
+            return None
+
+        smooth_rock = self.rock_history.mean()
+        sigma = self.estimate_volatility(self.rock_history)
+        if self.use_smile:
+            self.smile.update(rock_mid, np.array(mids))
+            smile_vol = self.smile.vol(smooth_rock)
+            if smile_vol is not None:
+                sigma = np.where(np.isfinite(smile_vol), smile_vol, sigma)
+        self.fair = black_scholes_calls(smooth_rock, self.strikes, self.T, self.r, sigma)
+        return self.fair
+
+
+
+
 class VoucherStrategy(Strategy):
      def __init__(self, symbol: str, limit: int):
          super().__init__(symbol, limit)
-         self.rock_history = []
          self.max_order_size = 10
          self.max_position = 200
          self.band_width = 5
+         self.strike = self.get_strike(symbol) if "VOUCHER" in symbol else None
+         # Trader swaps in one pricer shared by every voucher
+         self.pricer = VoucherPricer([self.strike] if self.strike is not None else [])
 
+     def register_signals(self, graph: SignalGraph) -> None:
+         # the first voucher to register owns the shared pricer node, and degrade() switches it for all
+         self.pricer.register_signals(graph, self.symbol)
 
      def get_strike(self, product: str) -> int:
          return int(product.split("_")[-1])
-     def get_mid_price(self, state, product: str) -> float | None:
-         od = state.order_depths.get(product)
-         if od and od.buy_orders and od.sell_orders:
-             return (max(od.buy_orders) + min(od.sell_orders)) / 2
-         return None
-     
-     def estimate_volatility(self, prices):
-         if len(prices) < 2:
-             return 0.01
-         log_returns = np.diff(np.log(prices[-30:]))
-         return max(0.01, np.std(log_returns))
-     
 
-     
-     def black_scholes_call(self, S, K, T, r, sigma):
-         if T <= 0 or sigma <= 0:
-             return max(0, S - K)
-         d1 = (math.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * math.sqrt(T))
-         d2 = d1 - sigma * math.sqrt(T)
-         return S * NormalDist().cdf(d1) - K * math.exp(-r * T) * NormalDist().cdf(d2)
-     
+     def degrade(self) -> bool:
+         # the smile solve is the expensive part, realized vol is nearly free
+         if self.pricer.use_smile:
+             self.pricer.use_smile = False
+             return True
+         return False
+
      def act(self, state: TradingState) -> list[Order]:
          self.orders = []
 
          if "VOUCHER" not in self.symbol:
              return []
-         
-         rock_mid = self.get_mid_price(state, "VOLCANIC_ROCK")
-
-         if rock_mid is None:
-             return []
-         
-         self.rock_history.append(rock_mid)
 
-         if len(self.rock_history) < 30:
+         fair = self.signals["vouchers.fair"]
+         if fair is None:
              return []
-         
-         smooth_rock = np.mean(self.rock_history[-30:])
-         sigma = self.estimate_volatility(self.rock_history)
 
-         r = 0.0 
+         fair_value = fair[self.pricer.index[self.strike]]
+         logger.signal(f"{self.strike}.fair", fair_value)
 
-         T = 1 / 252
-
-         strike = self.get_strike(self.symbol)
-         fair_value = self.black_scholes_call(smooth_rock, strike, T, r, sigma)
-         od = state.order_depths[self.symbol]
-
-         best_bid = max(od.buy_orders.keys(), default=None)
-         best_ask = min(od.sell_orders.keys(), default=None)
+         best_bid = self.snapshot.best_bid(self.symbol)
+         best_ask = self.snapshot.best_ask(self.symbol)
          position = state.position.get(self.symbol, 0)
 
          # --- BUY if market is undervalued ---
@@ -538,6 +1467,86 @@ class MacaronStrategy(Strategy):
 
 
 
+# wall time per strategy per tick in fixed log-spaced bins, plus an optional budget watchdog
+class LatencyMonitor:
+    # bin upper edges in microseconds, 1us .. ~60s with 25% steps
+    EDGES = [1.25 ** i for i in range(80)]
+
+    def __init__(self, tick_budget_ms: float = None, strategy_budget_ms: float = None, cooldown: int = 10) -> None:
+        self.tick_budget_ms = tick_budget_ms
+        self.strategy_budget_ms = strategy_budget_ms
+        self.cooldown = cooldown
+        self.hist = defaultdict(lambda: [0] * (len(self.EDGES) + 1))
+        self.total = defaultdict(float)
+        self.worst = defaultdict(float)
+        self.skipped = defaultdict(int)
+        self.benched = {}
+        self.tick_start = 0.0
+
+    def start_tick(self) -> None:
+        self.tick_start = time.perf_counter()
+        for name in list(self.benched):
+            self.benched[name] -= 1
+            if self.benched[name] <= 0:
+                del self.benched[name]
+
+    def allow(self, name: str) -> bool:
+        over_budget = (
+            self.tick_budget_ms is not None
+            and (time.perf_counter() - self.tick_start) * 1000 > self.tick_budget_ms
+        )
+        if over_budget or name in self.benched:
+            self.skipped[name] += 1
+            return False
+        return True
+
+    def blocked(self, name: str) -> bool:
+        # like allow() for a strategy's graph nodes, without counting a skip
+        return name in self.benched
+
+    def record(self, name: str, elapsed: float, strategy=None) -> None:
+        us = elapsed * 1e6
+        self.hist[name][bisect_left(self.EDGES, us)] += 1
+        self.total[name] += us
+        self.worst[name] = max(self.worst[name], us)
+
+        # a slow strategy first gets a chance to cheapen itself, otherwise it sits out a few ticks
+        if strategy is not None and self.strategy_budget_ms is not None and us > self.strategy_budget_ms * 1000:
+            if not strategy.degrade():
+                self.benched[name] = self.cooldown
+                logger.warn(f"{name} over budget, benched")
+
+    def end_tick(self) -> None:
+        self.record("TICK", time.perf_counter() - self.tick_start)
+
+    def percentile(self, name: str, q: float) -> float:
+        counts = self.hist[name]
+        target = q * sum(counts)
+        seen = 0
+        for i, c in enumerate(counts):
+            seen += c
+            if c and seen >= target:
+                # bins only give an upper bound, never report past the worst sample
+                return min(self.EDGES[min(i, len(self.EDGES) - 1)], self.worst[name]) / 1000
+        return 0.0
+
+    def report(self) -> dict:
+        out = {}
+        for name, counts in self.hist.items():
+            n = sum(counts)
+            out[name] = {
+                "count": n,
+                "mean_ms": self.total[name] / n / 1000 if n else 0.0,
+                "p50_ms": self.percentile(name, 0.50),
+                "p99_ms": self.percentile(name, 0.99),
+                "max_ms": self.worst[name] / 1000,
+                "skipped": self.skipped.get(name, 0),
+            }
+        return out
+
+
+
+
 #main 
 class Trader:
     
@@ -586,20 +1595,69 @@ class Trader:
             for symbol, strategy_class in strategy_classes.items()
       }
 
+      vouchers = [s for s in self.strategies.values() if isinstance(s, VoucherStrategy)]
+      pricer = VoucherPricer([s.strike for s in vouchers])
+      for strategy in vouchers:
+          strategy.pricer = pricer
+
+      recipes = RecipeMatrix()
+      for strategy in self.strategies.values():
+          if isinstance(strategy, (BasketStrategy, JamStrategy)):
+              strategy.recipes = recipes
+
+      # shared signals are computed once per tick in run(), strategies only read them
+      self.signals = SignalGraph()
+      for strategy in self.strategies.values():
+          strategy.signals = self.signals
+          strategy.register_signals(self.signals)
+
+      # exchange kills a run() call that takes too long; set budgets here to let the watchdog step in
+      self.latency = LatencyMonitor()
+
+      self.store = StateStore()
+      for symbol, strategy in self.strategies.items():
+          for attr in strategy.persist:
+              self.store.register(f"{symbol}.{attr}", strategy, attr, symbol=symbol)
+      self.store.register("rock_history", pricer, "rock_history", symbol="VOLCANIC_ROCK")
+      self.restored = False
+
     
     def run(self, state: TradingState):
 
-        print(f"{state.position}")
+        logger.positions(state.position)
         
         result = {}
 
         conversions = 0
-        traderData = ""
+
+        # a fresh instance with traderData means the exchange restarted us mid session
+        if not self.restored:
+            self.restored = True
+            self.store.loads(state.traderData)
+
+        snapshot = MarketSnapshot(state)
+        self.latency.start_tick()
+
+        # owned nodes are billed to their strategy below, SIGNALS keeps the shared part
+        start = time.perf_counter()
+        self.signals.evaluate(snapshot, self.latency)
+        owned = self.signals.cost
+        self.latency.record("SIGNALS", time.perf_counter() - start - sum(owned.values()))
 
         for symbol, strategy in self.strategies.items():
             if symbol in state.order_depths:
-                orders = strategy.run(state)
+                if not self.latency.allow(symbol):
+                    continue
+                start = time.perf_counter()
+                orders = strategy.step(state, snapshot)
+                self.latency.record(symbol, time.perf_counter() - start + owned.get(symbol, 0.0), strategy)
                 result[symbol] = orders
+                conversions += strategy.conversions
+
+        traderData = self.store.dumps(state.order_depths)
+
+        self.latency.end_tick()
+        logger.flush(state.timestamp)
 
         return result, conversions, traderData
 
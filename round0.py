@@ -1,7 +1,6 @@
 from collections import deque
 from datamodel import Order, TradingState
 from typing import List
-import numpy as np
 import math
 
 class Strategy:
@@ -91,28 +90,108 @@ class ResinStrategy(Strategy):
 
 
 #volatile
+# least squares line kept as weighted running sums (n, sx, sy, sxy, sxx), O(1) per point.
+# window evicts the oldest point, decay < 1 down-weights every older point by decay per update.
+# x is kept relative to the newest point and y relative to the first one, so the sums stay small
+class OnlineRegression:
+    def __init__(self, window: int = None, decay: float = 1.0) -> None:
+        self.window = window
+        self.decay = decay
+        # only a window needs the points back (eviction, rebuild); unbounded fits just keep the sums
+        self.points = deque()
+        self.count = 0
+        self.n = self.sx = self.sy = self.sxy = self.sxx = 0.0
+        self.x0 = None
+        self.y0 = None
+        self.last_y = None
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _shift(self, x) -> None:
+        # move the x origin to x: sums of (x - d) in terms of the old ones
+        d = x - self.x0
+        self.sxx += d * (d * self.n - 2 * self.sx)
+        self.sxy -= d * self.sy
+        self.sx -= d * self.n
+        self.x0 = x
+
+    def _add(self, dx, dy, w) -> None:
+        self.n += w
+        self.sx += w * dx
+        self.sy += w * dy
+        self.sxy += w * dx * dy
+        self.sxx += w * dx * dx
+
+    def append(self, x, y) -> None:
+        if self.x0 is None:
+            self.x0, self.y0 = x, y
+        self._shift(x)
+        if self.decay != 1.0:
+            d = self.decay
+            self.n *= d
+            self.sx *= d
+            self.sy *= d
+            self.sxy *= d
+            self.sxx *= d
+        self._add(0.0, y - self.y0, 1.0)
+        self.count += 1
+        self.last_y = y
+        if self.window is None:
+            return
+
+        self.points.append((x, y))
+        if len(self.points) > self.window:
+            self.count -= 1
+            old_x, old_y = self.points.popleft()
+            self._add(old_x - self.x0, old_y - self.y0, -self.decay ** self.window)
+            self.evictions += 1
+            if self.evictions >= self.window:
+                self.rebuild()
+
+    def rebuild(self) -> None:
+        # redo the sums from the stored points once per window so add/evict rounding can't pile up
+        self.evictions = 0
+        self.n = self.sx = self.sy = self.sxy = self.sxx = 0.0
+        w = 1.0
+        for x, y in reversed(self.points):
+            self._add(x - self.x0, y - self.y0, w)
+            w *= self.decay
+
+    def fit(self):
+        """(slope, intercept) with intercept at the newest x, None before the first point"""
+        if self.n <= 0:
+            return None
+        var = self.sxx * self.n - self.sx * self.sx
+        if var <= 1e-9 * self.n * self.n:
+            return 0.0, self.last_y
+        slope = (self.sxy * self.n - self.sx * self.sy) / var
+        return slope, self.y0 + (self.sy - slope * self.sx) / self.n
+
+    def predict(self, x):
+        fit = self.fit()
+        if fit is None:
+            return 0
+        slope, intercept = fit
+        return intercept + slope * (x - self.x0)
+
+    def forecast(self, xs) -> list:
+        # several horizons off the same fit
+        fit = self.fit()
+        if fit is None:
+            return [0 for _ in xs]
+        slope, intercept = fit
+        return [intercept + slope * (x - self.x0) for x in xs]
+
+
 class KelpStrategy(Strategy):
     def __init__(self, symbol: str, limit: int) -> None:
         super().__init__(symbol, limit)
         self.take_width = 1
         self.edge_width = 2
         self.tick = 0
-        self.mid_prices = deque(maxlen=10)
-        self.ticks = deque(maxlen=10)
-
-    def simple_linear_regression(self, xs, ys, next_x):
-        X = np.array(xs)
-        Y = np.array(ys)
-        if len(X) == 0:
-            return 0
-        x_mean = X.mean()
-        y_mean = Y.mean()
-        if np.var(X) == 0:
-            return Y[-1]
-
-        slope = np.sum((X - x_mean) * (Y - y_mean)) / np.sum((X - x_mean) ** 2)
-        intercept = y_mean - slope * x_mean
-        return slope * next_x + intercept
+        self.regression = OnlineRegression(window=10)
 
 
     def act(self, state: TradingState) -> list[Order]:
@@ -127,10 +206,9 @@ class KelpStrategy(Strategy):
         best_ask = min(order_depth.sell_orders.keys())
         mid_price = (best_bid + best_ask) / 2
 
-        self.mid_prices.append(mid_price)
-        self.ticks.append(self.tick)
+        self.regression.append(self.tick, mid_price)
 
-        fair_value = round(self.simple_linear_regression(self.ticks, self.mid_prices, self.tick + 100))
+        fair_value = round(self.regression.predict(self.tick + 100))
 
         orders = []
         buy_volume = 0
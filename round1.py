@@ -9,6 +9,91 @@ import math
 
 
 
+# fixed-size numpy ring of prices with running mean / std and log-return std, O(1) per update
+class PriceRing:
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.prices = np.zeros(capacity)
+        self.returns = np.zeros(capacity - 1)
+        self.count = 0
+        self.head = 0
+        self.n_returns = 0
+        self.return_head = 0
+        self.last = None
+        self.shift = 0.0
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        self.return_sum = 0.0
+        self.return_sum_sq = 0.0
+        self.updates = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, price: float) -> None:
+        if self.last is None:
+            # sums are kept relative to the first price so sum_sq stays small
+            self.shift = price
+        x = price - self.shift
+
+        if self.count == self.capacity:
+            old = self.prices[self.head] - self.shift
+            self.sum -= old
+            self.sum_sq -= old * old
+        else:
+            self.count += 1
+        self.prices[self.head] = price
+        self.head = (self.head + 1) % self.capacity
+        self.sum += x
+        self.sum_sq += x * x
+
+        if self.last is not None and len(self.returns):
+            r = math.log(price / self.last)
+            if self.n_returns == len(self.returns):
+                old = self.returns[self.return_head]
+                self.return_sum -= old
+                self.return_sum_sq -= old * old
+            else:
+                self.n_returns += 1
+            self.returns[self.return_head] = r
+            self.return_head = (self.return_head + 1) % len(self.returns)
+            self.return_sum += r
+            self.return_sum_sq += r * r
+        self.last = price
+
+        # wipe accumulated float drift once per full ring, amortised O(1)
+        self.updates += 1
+        if self.updates >= self.capacity:
+            self.updates = 0
+            prices = self.prices[:self.count] - self.shift
+            self.sum = float(prices.sum())
+            self.sum_sq = float((prices * prices).sum())
+            returns = self.returns[:self.n_returns]
+            self.return_sum = float(returns.sum())
+            self.return_sum_sq = float((returns * returns).sum())
+
+    def values(self) -> np.ndarray:
+        """prices oldest first"""
+        if self.count < self.capacity:
+            return self.prices[:self.count].copy()
+        return np.roll(self.prices, -self.head)
+
+    def mean(self) -> float:
+        return self.shift + self.sum / self.count
+
+    def std(self) -> float:
+        mean = self.sum / self.count
+        var = self.sum_sq / self.count - mean * mean
+        # prices sit on a 0.5 tick grid, anything this small is a flat window
+        return math.sqrt(var) if var > 1e-9 else 0.0
+
+    def return_std(self) -> float:
+        if self.n_returns == 0:
+            return 0.0
+        mean = self.return_sum / self.n_returns
+        return math.sqrt(max(self.return_sum_sq / self.n_returns - mean * mean, 0.0))
+
+
 
 
 
@@ -188,11 +273,11 @@ class SquidInkStrategy(Strategy):
         super().__init__(symbol, limit)
         # Initialize internal state storage in our own state dictionary.
         self.state = {}
-        self.state.setdefault("prices", [])
         self.state.setdefault("position", 0)
         self.state.setdefault("entry_price", None)  
 
         self.rolling_window = 50         
+        self.state.setdefault("prices", PriceRing(self.rolling_window))
         self.z_entry_threshold = 1.5       
         self.z_exit_threshold = 0.3
         self.max_position = 50        
@@ -267,9 +352,8 @@ class SquidInkStrategy(Strategy):
             return self.orders  # Skip further logic this tick.
 
         # Compute rolling statistics.
-        recent = prices[-self.rolling_window:]
-        mean_price = np.mean(recent)
-        std_price = np.std(recent)
+        mean_price = prices.mean()
+        std_price = prices.std()
         if std_price == 0:
             return self.orders
 